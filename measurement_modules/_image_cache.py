@@ -0,0 +1,40 @@
+# _image_cache.py
+
+import os
+import cv2
+
+# Intermediate stage outputs are only written to disk when DEBUG_DUMP=true
+DEBUG_DUMP = os.getenv('DEBUG_DUMP', 'false').lower() == 'true'
+
+# (absolute path, flags) -> (mtime_ns, size, image); the worker reuses relative paths in every job's directory
+_images = {}
+
+
+def dump_image(path, image):
+    """Write an intermediate stage output to path, only when DEBUG_DUMP=true"""
+    if DEBUG_DUMP:
+        cv2.imwrite(path, image)
+
+
+def get_image(path, flags=cv2.IMREAD_COLOR):
+    """
+    Decode an image once per process and share the array between pipeline stages.
+    The entry is refreshed when the file's mtime or size changes. Returned arrays are
+    read-only; callers that draw on the image must work on a .copy().
+    Returns None when the file cannot be read, like cv2.imread.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (os.path.abspath(path), flags)
+    cached = _images.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    image = cv2.imread(path, flags)
+    if image is not None:
+        image.setflags(write=False)
+        _images[key] = (stat.st_mtime_ns, stat.st_size, image)
+    return image
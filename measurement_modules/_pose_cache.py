@@ -0,0 +1,15 @@
+# _pose_cache.py
+
+import mediapipe as mp
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_pose(slot=0, model_complexity=1):
+    """
+    Static-image MediaPipe Pose graph, built once per process and shared by every stage
+    (loading the model is the slow part). Each photo is independent, so no tracking state
+    is carried between calls. A Pose instance is not thread-safe; concurrent callers must
+    use different slots. Each (slot, model_complexity) pair is its own instance.
+    """
+    return mp.solutions.pose.Pose(static_image_mode=True, model_complexity=model_complexity)
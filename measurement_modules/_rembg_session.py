@@ -0,0 +1,35 @@
+# _rembg_session.py
+
+import os
+from functools import lru_cache
+from _result_cache import cached_array
+
+# u2netp is the small U2-Net variant; REMBG_MODEL_PATH points at a custom (e.g. int8-quantized)
+# ONNX export of it and takes precedence over the named model
+REMBG_MODEL = os.getenv('REMBG_MODEL', 'u2netp')
+REMBG_MODEL_PATH = os.getenv('REMBG_MODEL_PATH')
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    """
+    rembg session built on first use and shared by every later call in the process.
+    rembg is imported here rather than at module level, so stages that never remove a
+    background do not pay for loading onnxruntime and the U2-Net model.
+    """
+    from rembg import new_session
+    providers = ['CPUExecutionProvider']
+    if REMBG_MODEL_PATH:
+        return new_session('u2net_custom', providers=providers, model_path=REMBG_MODEL_PATH)
+    return new_session(REMBG_MODEL, providers=providers)
+
+
+def remove_background(image):
+    """Cut the person out of a BGR image with the shared rembg session"""
+    def compute():
+        from rembg import remove
+        return remove(image, session=get_session())
+
+    model = os.path.basename(REMBG_MODEL_PATH) if REMBG_MODEL_PATH else REMBG_MODEL
+    tag = f"rembg-{model}-{'x'.join(map(str, image.shape))}"
+    return cached_array(tag, image, compute)
@@ -0,0 +1,28 @@
+# _result_cache.py
+
+import os
+import hashlib
+import numpy as np
+
+# Model outputs are memoized across runs in this directory; unset (the default) disables it
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR')
+
+
+def cached_array(tag, data, compute):
+    """
+    Return compute() for an input, memoized on disk by a BLAKE2b hash of the input's bytes.
+    The tag names the computation and any setting that changes its output, so results of
+    different models or input sizes never share an entry.
+    """
+    if not RESULT_CACHE_DIR:
+        return compute()
+
+    digest = hashlib.blake2b(np.ascontiguousarray(data), digest_size=16).hexdigest()
+    path = os.path.join(RESULT_CACHE_DIR, f'{tag}-{digest}.npy')
+    if os.path.exists(path):
+        return np.load(path)
+
+    result = compute()
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    np.save(path, result)
+    return result
@@ -1,6 +1,10 @@
 from PIL import Image
 
-img = Image.open('images/remove.jpg')
+# Taken from the background-removal stage the same way it takes the contrast images
+if 'removed_image' not in globals():
+    from remove_backround import removed_image, removed_image_side
+
+img = Image.fromarray(removed_image[:, :, 2::-1])
 width = img.size[0]
 height = img.size[1]
 for i in range(0, width):  # process all pixels
@@ -22,7 +26,7 @@ except Exception as e:
     print("An error occurred while saving the image:", e)
 
 
-img_side = Image.open('images/remove_side.jpg')
+img_side = Image.fromarray(removed_image_side[:, :, 2::-1])
 width_side = img_side.size[0]
 height_side = img_side.size[1]
 for i in range(0, width_side):  # process all pixels
@@ -87,7 +87,8 @@ class AnthropometricBodyValidator:
         gender = self.detect_gender(measurements)
         
         # Extract core measurements with defaults based on height
-        height = measurements.get('height', 170.0)
+        measurements.setdefault('height', 170.0)
+        height = measurements['height']
         
         # Initialize result structure
         result = {
@@ -381,9 +382,10 @@ class AnthropometricBodyValidator:
                             if isinstance(data, dict) and data.get('source') == 'estimated')
         
         # Calculate confidence: original=100%, corrected=70%, estimated=40%
+        # Weighted average of 40/70/100 is already bounded to [40, 100]
         confidence = ((original_count * 100) + (corrected_count * 70) + (estimated_count * 40)) / total_measurements
         
-        return min(100, max(0, confidence))
+        return confidence
     
     def _classify_clothing_size(self, chest, waist, hip, gender):
         """Classify clothing size using distance scoring"""
@@ -1,52 +1,170 @@
 from medipie_cooordinates import *
+from concurrent.futures import ThreadPoolExecutor
 from math import sqrt
+import numpy as np
 import os
-import time
 
 # Ensure images directory exists
 if not os.path.exists('images'):
     os.makedirs('images')
     print("Created 'images' directory")
 
+# Silhouettes are black/white, so probing only needs one channel
 image_front_silhouette_path = 'images/add_silhouette.jpg'
-image_front_silhouette = cv2.imread(image_front_silhouette_path)
+image_front_silhouette_gray = cv2.imread(image_front_silhouette_path, cv2.IMREAD_GRAYSCALE)
 
 image_side_silhouette_path = 'images/add_silhouette_side.jpg'
-image_side_silhouette = cv2.imread(image_side_silhouette_path)
+image_side_silhouette_gray = cv2.imread(image_side_silhouette_path, cv2.IMREAD_GRAYSCALE)
 
+# Background masks computed once per image; every border probe becomes a single lookup
+color_background = 5
+front_background = image_front_silhouette_gray < color_background
+side_background = image_side_silhouette_gray < color_background
 
-def save_image_with_retry(image, filepath, max_retries=3):
-    """Save image with retry logic for permission errors"""
+# Color copies used only for drawing the measurement overlay
+image_front_silhouette = cv2.cvtColor(image_front_silhouette_gray, cv2.COLOR_GRAY2BGR)
+image_side_silhouette = cv2.cvtColor(image_side_silhouette_gray, cv2.COLOR_GRAY2BGR)
+
+
+# Single background thread that writes encoded images to disk
+image_writer = ThreadPoolExecutor(max_workers=1)
+
+
+def write_image_bytes(filepath, buffer, max_retries=3):
+    """Write an encoded image with retry logic for permission errors"""
     for attempt in range(max_retries):
         try:
-            success = cv2.imwrite(filepath, image)
-            if success:
-                return True
-            else:
-                raise Exception("cv2.imwrite returned False")
-        except Exception as e:
+            with open(filepath, 'wb') as f:
+                f.write(buffer)
+            return True
+        except OSError:
             if attempt < max_retries - 1:
                 print(f"Warning: Could not save {filepath}, retrying... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(0.5)  # Wait before retry
-                
-                # Try to close any file handles
-                try:
-                    import gc
-                    gc.collect()
-                except:
-                    pass
-            else:
-                print(f"Error: Could not save {filepath} after {max_retries} attempts")
-                # Try alternative filename
-                alt_filepath = filepath.replace('.jpg', f'_backup.jpg')
-                try:
-                    if cv2.imwrite(alt_filepath, image):
-                        print(f"Saved to alternative path: {alt_filepath}")
-                        return True
-                except:
-                    print(f"Could not save to alternative path either: {alt_filepath}")
-                    return False
-    return False
+
+    print(f"Error: Could not save {filepath} after {max_retries} attempts")
+    # Try alternative filename
+    alt_filepath = filepath.replace('.jpg', '_backup.jpg')
+    try:
+        with open(alt_filepath, 'wb') as f:
+            f.write(buffer)
+        print(f"Saved to alternative path: {alt_filepath}")
+        return True
+    except OSError:
+        print(f"Could not save to alternative path either: {alt_filepath}")
+        return False
+
+
+def save_image_with_retry(image, filepath, max_retries=3):
+    """
+    Encode the image in memory and hand the file write to the background writer.
+    Returns a Future resolving to True/False, or None if the image could not be encoded.
+    """
+    success, buffer = cv2.imencode(os.path.splitext(filepath)[1], image)
+    if not success:
+        print(f"Error: Could not encode {filepath}")
+        return None
+    return image_writer.submit(write_image_bytes, filepath, buffer.tobytes(), max_retries)
+
+
+def find_ray_borders(background, x_mid, y_mid, slope, direction, max_length=5000):
+    """
+    Batched ray march over a background mask: ray i walks from (x_mid[i], y_mid[i]) along
+    y = y_mid + slope * dx, stepping x by direction (+1 or -1).
+    Returns, per ray, whether a background pixel was hit, its x and y, and the distance to the
+    last silhouette pixel before it. A ray that leaves the image without hitting background
+    returns its last in-image step (its start when no step is inside) as x and y instead.
+    """
+    height, width = background.shape
+    # x moves one pixel per step, so no ray can stay inside the image for more than width steps
+    max_length = min(max_length, width)
+    x_mid = np.asarray(x_mid, dtype=np.int64)[:, None]
+    y_mid = np.asarray(y_mid, dtype=np.int64)[:, None]
+    slope = np.asarray(slope, dtype=np.float64)[:, None]
+    dx = np.arange(1, max_length + 1) * direction
+    xs = x_mid + dx
+    ys = (y_mid + slope * dx).astype(np.int64)
+
+    # Every step after a ray first leaves the image is ignored
+    inside = np.logical_and.accumulate((xs >= 0) & (xs < width) & (ys >= 0) & (ys < height), axis=1)
+    hits = np.zeros(xs.shape, dtype=bool)
+    hits[inside] = background[ys[inside], xs[inside]]
+
+    found = hits.any(axis=1)
+    last = np.where(found, hits.argmax(axis=1), inside.sum(axis=1))
+    rows = np.arange(len(last))
+    before = np.maximum(last - 1, 0)
+    distance = np.where(last > 0, np.hypot(xs[rows, before] - x_mid[:, 0], ys[rows, before] - y_mid[:, 0]), 0.0)
+    end = np.where(found, last, before)
+    stepped = found | (last > 0)
+    return (found, np.where(stepped, xs[rows, end], x_mid[:, 0]), np.where(stepped, ys[rows, end], y_mid[:, 0]),
+            distance)
+
+
+def find_horizontal_borders(background, x_mid, y_mid, max_length, row_columns):
+    """
+    Return the x of the first background pixel to the right and to the left of x_mid on row y_mid
+    (None when not found within max_length). The background columns of each row are computed once
+    and cached in row_columns, so every query on that row is a binary search.
+    """
+    if y_mid not in row_columns:
+        row_columns[y_mid] = np.flatnonzero(background[y_mid])
+    columns = row_columns[y_mid]
+
+    right = np.searchsorted(columns, x_mid, side='right')
+    left = np.searchsorted(columns, x_mid, side='left') - 1
+    x_right = int(columns[right]) if right < len(columns) and columns[right] - x_mid <= max_length else None
+    x_left = int(columns[left]) if left >= 0 and x_mid - columns[left] <= max_length else None
+    return x_right, x_left
+
+
+def probe_measurements(background, points, perpendicular, max_length=5000):
+    """
+    Probe all measurements of one view: single points are measured horizontally, point pairs along
+    their line or perpendicular to it, with one batched ray march per direction.
+    Returns one entry per point: None when the pair gives no direction to probe, otherwise
+    (border_up, border_down, distance_up, distance_down) with each border an (x, y) tuple or None.
+    """
+    probes = [None] * len(points)
+    if not points:
+        return probes
+
+    # Endpoints as (N, 2) arrays so midpoints and slopes are computed for all measurements at once
+    point_one = np.array([point[0] for point in points], dtype=np.float64)
+    point_two = np.array([point[1] for point in points], dtype=np.float64)
+    x_mid, y_mid = ((point_one + point_two) / 2).astype(np.int64).T
+    dx = point_one[:, 0] - point_two[:, 0]
+    dy = point_one[:, 1] - point_two[:, 1]
+    single = (dx == 0) & (dy == 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = dy / dx
+        if perpendicular:
+            slope = -1 / slope
+    # Vertical pairs (and the perpendicular of horizontal ones) give no direction to march along
+    sloped = (dx != 0) & np.isfinite(slope)
+
+    # Single points report the distance to the border pixel itself, or 0 when there is none
+    row_columns = {}
+    for idx in np.flatnonzero(single).tolist():
+        x, y = int(x_mid[idx]), int(y_mid[idx])
+        x_right, x_left = find_horizontal_borders(background, x, y, max_length, row_columns)
+        probes[idx] = ((x_left, y) if x_left is not None else None,
+                       (x_right, y) if x_right is not None else None,
+                       x - x_left if x_left is not None else 0,
+                       x_right - x if x_right is not None else 0)
+
+    indices = np.flatnonzero(sloped)
+    if not len(indices):
+        return probes
+
+    x_mid, y_mid, slope = x_mid[indices], y_mid[indices], slope[indices]
+    found_down, x_down, y_down, distance_down = find_ray_borders(background, x_mid, y_mid, slope, 1, max_length)
+    found_up, x_up, y_up, distance_up = find_ray_borders(background, x_mid, y_mid, slope, -1, max_length)
+
+    for ray, idx in enumerate(indices.tolist()):
+        probes[idx] = ((int(x_up[ray]), int(y_up[ray])) if found_up[ray] else None,
+                       (int(x_down[ray]), int(y_down[ray])) if found_down[ray] else None,
+                       float(distance_up[ray]), float(distance_down[ray]))
+    return probes
 
 
 def mid_point_chest_segment():
@@ -68,7 +186,6 @@ def mid_point_chest_segment_side():
 # New helper functions for additional measurements
 def get_neck_point():
     # Neck point is between shoulders and ears
-    mid_shoulder = mid_point_chest_segment()[1]
     mid_ear = [((right_ear[0] + left_ear[0]) / 2), ((right_ear[1] + left_ear[1]) / 2)]
     neck_point = [((mid_shoulder[0] + mid_ear[0]) / 2), ((mid_shoulder[1] + mid_ear[1]) / 2)]
     return neck_point
@@ -76,8 +193,6 @@ def get_neck_point():
 
 def get_chest_point():
     # Chest point is between shoulders and hips (upper third)
-    mid_shoulder = mid_point_chest_segment()[1]
-    mid_hip = mid_point_chest_segment()[0]
     chest_point = [(mid_shoulder[0] + (mid_hip[0] - mid_shoulder[0]) * 0.3),
                    (mid_shoulder[1] + (mid_hip[1] - mid_shoulder[1]) * 0.3)]
     return chest_point
@@ -85,16 +200,13 @@ def get_chest_point():
 
 def get_crotch_point():
     # Crotch point is at hip level
-    return mid_point_chest_segment()[0]
+    return mid_hip
 
 
-mid_hip = mid_point_chest_segment()[0]
-mid_shoulder = mid_point_chest_segment()[1]
-chest_height = mid_point_chest_segment()[2]
+# Computed once; the point helpers above read these module-level values
+mid_hip, mid_shoulder, chest_height = mid_point_chest_segment()
 
-mid_hip_side = mid_point_chest_segment_side()[0]
-mid_shoulder_side = mid_point_chest_segment_side()[1]
-chest_height_side = mid_point_chest_segment_side()[2]
+mid_hip_side, mid_shoulder_side, chest_height_side = mid_point_chest_segment_side()
 
 # Updated points list with new measurements
 points = [(left_ankle, left_knee),
@@ -187,8 +299,12 @@ points_linear_side_names = ["shoulders side",
                             ]
 
 
-def calculate_distance(point):
-    global x_perp1, y_perp1, x_perp2, y_perp2, current_distance_down, current_distance_up
+def calculate_distance(image, point, probe):
+    """
+    Draw one probed measurement on its silhouette image.
+    Returns (distance_body_part, x_perp1, y_perp1, x_perp2, y_perp2); border coordinates are None
+    when no border was found on that side.
+    """
     point_one = point[0]
     point_two = point[1]
 
@@ -197,338 +313,38 @@ def calculate_distance(point):
     x_mid, y_mid = int(middle_point[0]), int(middle_point[1])
     middle_point_int = [x_mid, y_mid]
 
-    image_front_silhouette_rgb = cv2.cvtColor(image_front_silhouette, cv2.COLOR_BGR2RGB)
-
-    # Handle single point measurements (for circumferences)
-    if point_one == point_two:
-        # For single points, measure perpendicular width
-        current_distance = 0
-        max_length = 5000
-        current_x = x_mid
-        color_background = 5
-        current_distance_down = 0
-        current_distance_up = 0
-        
-        # Find border to the right
-        while current_distance < max_length:
-            current_x += 1
-            if current_x >= image_front_silhouette.shape[1]:
-                break
-            if image_front_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp2 = current_x
-                y_perp2 = y_mid
-                current_distance_down = abs(current_x - x_mid)
-                break
-            current_distance += 1
-            
-        # Find border to the left
-        current_x = x_mid
-        current_distance = 0
-        while current_distance < max_length:
-            current_x -= 1
-            if current_x < 0:
-                break
-            if image_front_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp1 = current_x
-                y_perp1 = y_mid
-                current_distance_up = abs(x_mid - current_x)
-                break
-            current_distance += 1
-    else:
-        if point_one[0] != point_two[0]:
-            slope_original = (point_one[1] - point_two[1]) / (point_one[0] - point_two[0])
-            slope_perpendicular = -1 / slope_original
-
-            current_distance = 0
-            max_length = 5000
-            current_x = x_mid
-            color_background = 5
-            # Find border in one direction
-            while current_distance < max_length:
-                current_x += 1
-                current_y = int(y_mid + slope_perpendicular * (current_x - x_mid))
-                if current_y < 0 or current_y >= image_front_silhouette.shape[0]:
-                    break
-                if current_x >= image_front_silhouette.shape[1]:
-                    break
-                if image_front_silhouette[current_y, current_x].sum() < color_background:
-                    x_perp2 = current_x
-                    y_perp2 = current_y
-                    break
-                current_distance_down = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-            
-            current_x = x_mid
-            while current_distance < max_length:
-                current_x -= 1
-                current_y = int(y_mid + slope_perpendicular * (current_x - x_mid))
-                if current_y < 0 or current_y >= image_front_silhouette.shape[0]:
-                    break
-                if current_x < 0:
-                    break
-                if image_front_silhouette[current_y, current_x].sum() < color_background:
-                    x_perp1 = current_x
-                    y_perp1 = current_y
-                    break
-                current_distance_up = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-
-    distance_body_part = current_distance_up + current_distance_down
-    cv2.line(image_front_silhouette, (x_perp1, y_perp1), (x_perp2, y_perp2), (0, 255, 0), 2)
-    save_image_with_retry(image_front_silhouette, "images/body_segments.jpg")
-
-    cv2.circle(image_front_silhouette, middle_point_int, 5, (0, 0, 255), -1)
-
-    return distance_body_part
-
-
-def calculate_distance_linear(point):
-    global x_perp1, y_perp1, x_perp2, y_perp2, current_distance_down, current_distance_up
-    point_one = point[0]
-    point_two = point[1]
-
-    middle_point = [((point_one[0] + point_two[0]) / 2), ((point_one[1] + point_two[1]) / 2)]
-
-    x_mid, y_mid = int(middle_point[0]), int(middle_point[1])
-    middle_point_int = [x_mid, y_mid]
-
-    image_front_silhouette_rgb = cv2.cvtColor(image_front_silhouette, cv2.COLOR_BGR2RGB)
-
-    # For linear measurements, calculate direct distance or use existing logic
-    if point_one == point_two:
-        # For foot width, measure perpendicular to foot
-        current_distance = 0
-        max_length = 5000
-        current_x = x_mid
-        color_background = 5
-        current_distance_down = 0
-        current_distance_up = 0
-        
-        # Find border perpendicular
-        while current_distance < max_length:
-            current_x += 1
-            if current_x >= image_front_silhouette.shape[1]:
-                break
-            if image_front_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp2 = current_x
-                y_perp2 = y_mid
-                current_distance_down = abs(current_x - x_mid)
-                break
-            current_distance += 1
-            
-        current_x = x_mid
-        current_distance = 0
-        while current_distance < max_length:
-            current_x -= 1
-            if current_x < 0:
-                break
-            if image_front_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp1 = current_x
-                y_perp1 = y_mid
-                current_distance_up = abs(x_mid - current_x)
-                break
-            current_distance += 1
-        distance_body_part = current_distance_up + current_distance_down
-    elif point_one[0] != point_two[0]:
-        slope_original = (point_one[1] - point_two[1]) / (point_one[0] - point_two[0])
-
-        current_distance = 0
-        max_length = 5000
-        current_x = x_mid
-        color_background = 5
-        # Find border in one direction
-        while current_distance < max_length:
-            current_x += 1
-            current_y = int(y_mid + slope_original * (current_x - x_mid))
-            if current_y < 0 or current_y >= image_front_silhouette.shape[0]:
-                break
-            if current_x >= image_front_silhouette.shape[1]:
-                break
-            if image_front_silhouette[current_y, current_x].sum() < color_background:
-                x_perp2 = current_x
-                y_perp2 = current_y
-                break
-            current_distance_down = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-        
-        current_x = x_mid
-        while current_distance < max_length:
-            current_x -= 1
-            current_y = int(y_mid + slope_original * (current_x - x_mid))
-            if current_y < 0 or current_y >= image_front_silhouette.shape[0]:
-                break
-            if current_x < 0:
-                break
-            if image_front_silhouette[current_y, current_x].sum() < color_background:
-                x_perp1 = current_x
-                y_perp1 = current_y
-                break
-            current_distance_up = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
+    x_perp1 = y_perp1 = x_perp2 = y_perp2 = None
+    distance_body_part = 0
 
+    # probe comes from probe_measurements; None when the points give no direction
+    if probe is not None:
+        border_up, border_down, current_distance_up, current_distance_down = probe
         distance_body_part = current_distance_up + current_distance_down
-    else:
-        distance_body_part = 0
+        if border_up is not None:
+            x_perp1, y_perp1 = border_up
+        if border_down is not None:
+            x_perp2, y_perp2 = border_down
 
-    cv2.line(image_front_silhouette, (x_perp1, y_perp1), (x_perp2, y_perp2), (0, 255, 0), 2)
-    save_image_with_retry(image_front_silhouette, "images/body_segments.jpg")
-    cv2.circle(image_front_silhouette, middle_point_int, 5, (0, 0, 255), -1)
+    if x_perp1 is not None and x_perp2 is not None:
+        cv2.line(image, (x_perp1, y_perp1), (x_perp2, y_perp2), (0, 255, 0), 2)
+    cv2.circle(image, middle_point_int, 5, (0, 0, 255), -1)
 
-    return distance_body_part
+    return distance_body_part, x_perp1, y_perp1, x_perp2, y_perp2
 
 
-def calculate_distance_side(point):
-    global x_perp1, y_perp1, x_perp2, y_perp2, current_distance_down, current_distance_up
-    point_one = point[0]
-    point_two = point[1]
-
-    middle_point = [((point_one[0] + point_two[0]) / 2), ((point_one[1] + point_two[1]) / 2)]
-
-    x_mid, y_mid = int(middle_point[0]), int(middle_point[1])
-    middle_point_int = [x_mid, y_mid]
-
-    image_side_silhouette_rgb = cv2.cvtColor(image_side_silhouette, cv2.COLOR_BGR2RGB)
-
-    # Handle single point measurements
-    if point_one == point_two:
-        current_distance = 0
-        max_length = 5000
-        current_x = x_mid
-        color_background = 5
-        current_distance_down = 0
-        current_distance_up = 0
-        
-        # Find border to the right
-        while current_distance < max_length:
-            current_x += 1
-            if current_x >= image_side_silhouette.shape[1]:
-                break
-            if image_side_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp2 = current_x
-                y_perp2 = y_mid
-                current_distance_down = abs(current_x - x_mid)
-                break
-            current_distance += 1
-            
-        # Find border to the left
-        current_x = x_mid
-        current_distance = 0
-        while current_distance < max_length:
-            current_x -= 1
-            if current_x < 0:
-                break
-            if image_side_silhouette[y_mid, current_x].sum() < color_background:
-                x_perp1 = current_x
-                y_perp1 = y_mid
-                current_distance_up = abs(x_mid - current_x)
-                break
-            current_distance += 1
-    else:
-        if point_one[0] != point_two[0]:
-            slope_original = (point_one[1] - point_two[1]) / (point_one[0] - point_two[0])
-            slope_perpendicular = -1 / slope_original
-
-            current_distance = 0
-            max_length = 5000
-            current_x = x_mid
-            color_background = 5
-            # Find border in one direction
-            while current_distance < max_length:
-                current_x += 1
-                current_y = int(y_mid + slope_perpendicular * (current_x - x_mid))
-                if current_y < 0 or current_y >= image_side_silhouette.shape[0]:
-                    break
-                if current_x >= image_side_silhouette.shape[1]:
-                    break
-                if image_side_silhouette[current_y, current_x].sum() < color_background:
-                    x_perp2 = current_x
-                    y_perp2 = current_y
-                    break
-                current_distance_down = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-            
-            current_x = x_mid
-            while current_distance < max_length:
-                current_x -= 1
-                current_y = int(y_mid + slope_perpendicular * (current_x - x_mid))
-                if current_y < 0 or current_y >= image_side_silhouette.shape[0]:
-                    break
-                if current_x < 0:
-                    break
-                if image_side_silhouette[current_y, current_x].sum() < color_background:
-                    x_perp1 = current_x
-                    y_perp1 = current_y
-                    break
-                current_distance_up = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-
-    distance_body_part = current_distance_up + current_distance_down
-    cv2.line(image_side_silhouette, (x_perp1, y_perp1), (x_perp2, y_perp2), (0, 255, 0), 2)
-    
-    # Use the retry function for saving
-    save_image_with_retry(image_side_silhouette, "images/body_segments_side.jpg")
-
-    cv2.circle(image_side_silhouette, middle_point_int, 5, (0, 0, 255), -1)
-
-    return distance_body_part
-
-
-def calculate_distance_side_linear(point):
-    global x_perp1, y_perp1, x_perp2, y_perp2, current_distance_down, current_distance_up
-    point_one = point[0]
-    point_two = point[1]
-
-    middle_point = [((point_one[0] + point_two[0]) / 2), ((point_one[1] + point_two[1]) / 2)]
-
-    x_mid, y_mid = int(middle_point[0]), int(middle_point[1])
-    middle_point_int = [x_mid, y_mid]
-
-    image_side_silhouette_rgb = cv2.cvtColor(image_side_silhouette, cv2.COLOR_BGR2RGB)
-
-    if point_one[0] != point_two[0]:
-        slope_original = (point_one[1] - point_two[1]) / (point_one[0] - point_two[0])
-
-        current_distance = 0
-        max_length = 5000
-        current_x = x_mid
-        color_background = 5
-        # Find border in one direction
-        while current_distance < max_length:
-            current_x += 1
-            current_y = int(y_mid + slope_original * (current_x - x_mid))
-            if current_y < 0 or current_y >= image_side_silhouette.shape[0]:
-                break
-            if current_x >= image_side_silhouette.shape[1]:
-                break
-            if image_side_silhouette[current_y, current_x].sum() < color_background:
-                x_perp2 = current_x
-                y_perp2 = current_y
-                break
-            current_distance_down = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-        
-        current_x = x_mid
-        while current_distance < max_length:
-            current_x -= 1
-            current_y = int(y_mid + slope_original * (current_x - x_mid))
-            if current_y < 0 or current_y >= image_side_silhouette.shape[0]:
-                break
-            if current_x < 0:
-                break
-            if image_side_silhouette[current_y, current_x].sum() < color_background:
-                x_perp1 = current_x
-                y_perp1 = current_y
-                break
-            current_distance_up = sqrt((y_mid - current_y) ** 2 + (x_mid - current_x) ** 2)
-
-    distance_body_part = current_distance_up + current_distance_down
-    cv2.line(image_side_silhouette, (x_perp1, y_perp1), (x_perp2, y_perp2), (0, 255, 0), 2)
-    
-    # Use the retry function for saving
-    save_image_with_retry(image_side_silhouette, "images/body_segments_side.jpg")
-
-    cv2.circle(image_side_silhouette, middle_point_int, 5, (0, 0, 255), -1)
-
-    return distance_body_part
-
+# The four measurement sets read their masks only, so they are probed concurrently;
+# drawing stays sequential because front and front linear share one overlay image
+with ThreadPoolExecutor(max_workers=4) as executor:
+    probes_front, probes_side, probes_front_linear, probes_side_linear = executor.map(
+        probe_measurements,
+        [front_background, side_background, front_background, side_background],
+        [points, points_side, points_linear_front, points_linear_side],
+        [True, True, False, False])
 
 print("-----------------------------------------------------------------------------")
 output_front = []
 for idx, point in enumerate(points):
-    output_front.append(calculate_distance(point))
+    output_front.append(calculate_distance(image_front_silhouette, point, probes_front[idx])[0])
     print(f"{points_names[idx]}: {output_front[idx]}")
 print("Front view measurements array in pixel distance:")
 print(output_front)
@@ -536,7 +352,7 @@ print("-------------------------------------------------------------------------
 
 output_side = []
 for idx, point in enumerate(points_side):
-    output_side.append(calculate_distance_side(point))
+    output_side.append(calculate_distance(image_side_silhouette, point, probes_side[idx])[0])
     print(f"{points_side_names[idx]}: {output_side[idx]}")
 print("Side view measurements array in pixel distance:")
 print(output_side)
@@ -544,7 +360,7 @@ print("-------------------------------------------------------------------------
 
 output_front_linear = []
 for idx, point in enumerate(points_linear_front):
-    output_front_linear.append(calculate_distance_linear(point))
+    output_front_linear.append(calculate_distance(image_front_silhouette, point, probes_front_linear[idx])[0])
     print(f"{points_linear_front_names[idx]}: {output_front_linear[idx]}")
 print("Front linear view measurements array in pixel distance:")
 print(output_front_linear)
@@ -552,7 +368,15 @@ print("-------------------------------------------------------------------------
 
 output_side_linear = []
 for idx, point in enumerate(points_linear_side):
-    output_side_linear.append(calculate_distance_side_linear(point))
+    output_side_linear.append(calculate_distance(image_side_silhouette, point, probes_side_linear[idx])[0])
     print(f"{points_linear_side_names[idx]}: {output_side_linear[idx]}")
 print("Side linear view measurements array in pixel distance:")
 print(output_side_linear)
+
+# Save the annotated silhouettes once all measurements have been drawn
+pending_writes = [save_image_with_retry(image_front_silhouette, "images/body_segments.jpg"),
+                  save_image_with_retry(image_side_silhouette, "images/body_segments_side.jpg")]
+# Later stages read these files, so wait for the writer before moving on
+for pending in pending_writes:
+    if pending is not None:
+        pending.result()
@@ -1,6 +1,11 @@
 import numpy as np
 import cv2 as cv
 import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Save each calibration image with its detected chessboard corners drawn
+DEBUG_CORNERS = False
 
 criteria = (cv.TERM_CRITERIA_EPS + cv.TERM_CRITERIA_MAX_ITER, 30, 0.001)
 
@@ -11,26 +16,6 @@ objp[:, :2] = np.mgrid[0:pattern_size[0], 0:pattern_size[1]].T.reshape(-1, 2)
 objpoints = []  # 3d point in real world space
 imgpoints = []  # 2d points in image plane.
 
-images = glob.glob('attachments (4)/*jpg')
-
-for fname in images:
-    img = cv.imread(fname)
-    gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
-    # Find the chess board corners
-    ret, corners = cv.findChessboardCorners(gray, (7, 5), None)
-    # If found, add object points, image points (after refining them)
-    if ret:
-        objpoints.append(objp)
-        corners2 = cv.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
-        imgpoints.append(corners2)
-
-        # Draw and display the corners
-        cv.drawChessboardCorners(img, (7, 5), corners2, ret)
-        # cv.imshow('img', img)
-        # cv.waitKey()
-        cv.imwrite('*.jpg', img)
-cv.destroyAllWindows()
-
 image_names = ['test_images/exp1_front.jpg', 'test_images/exp1_side.jpg',
                'test_images/exp2_front.jpg', 'test_images/exp2_side.jpg',
                'test_images/exp3_front.jpg', 'test_images/exp3_side.jpg',
@@ -54,16 +39,57 @@ image_outputs = ['test_images_calibrated/exp1_front_cal.jpg', 'test_images_calib
                  'test_images_calibrated/exp10_front_cal.jpg', 'test_images_calibrated/exp10_side_cal.jpg',
                  'test_images_calibrated/exp11_front_cal.jpg', 'test_images_calibrated/exp11_side_cal.jpg']
 
+# Camera intrinsics, set in each worker process by _init_worker
+mtx = None
+dist = None
+# Undistortion remap tables keyed by image size (w, h)
+undistort_maps = {}
+
+
+def _init_worker(camera_matrix, dist_coeffs):
+    global mtx, dist
+    mtx = camera_matrix
+    dist = dist_coeffs
 
-ret, mtx, dist, rvecs, tvecs = cv.calibrateCamera(objpoints, imgpoints, gray.shape[::-1], None, None)
 
-for x in range(22):
-    img = cv.imread(image_names[x])
+def _undistort_one(pair):
+    name, output = pair
+    img = cv.imread(name)
     h, w = img.shape[:2]
-    newcameramtx, roi = cv.getOptimalNewCameraMatrix(mtx, dist, (w, h), 1, (w, h))
+    if (w, h) not in undistort_maps:
+        newcameramtx, roi = cv.getOptimalNewCameraMatrix(mtx, dist, (w, h), 1, (w, h))
+        undistort_maps[(w, h)] = cv.initUndistortRectifyMap(mtx, dist, None, newcameramtx, (w, h), cv.CV_16SC2)
+    map1, map2 = undistort_maps[(w, h)]
     # undistort
-    dst = cv.undistort(img, mtx, dist, None, newcameramtx)
+    dst = cv.remap(img, map1, map2, cv.INTER_LINEAR)
     # crop the image
     # x, y, w, h = roi
     # dst = dst[y:y+h, x:x+w]
-    cv.imwrite(image_outputs[x], dst)
+    cv.imwrite(output, dst)
+
+
+if __name__ == '__main__':
+    images = glob.glob('attachments (4)/*jpg')
+
+    for fname in images:
+        img = cv.imread(fname)
+        gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+        # Find the chess board corners
+        ret, corners = cv.findChessboardCorners(gray, (7, 5), None)
+        # If found, add object points, image points (after refining them)
+        if ret:
+            objpoints.append(objp)
+            corners2 = cv.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+            imgpoints.append(corners2)
+
+            # Draw and save the corners for inspection
+            if DEBUG_CORNERS:
+                cv.drawChessboardCorners(img, (7, 5), corners2, ret)
+                os.makedirs('debug_corners', exist_ok=True)
+                cv.imwrite(os.path.join('debug_corners', os.path.basename(fname)), img)
+
+    ret, mtx, dist, rvecs, tvecs = cv.calibrateCamera(objpoints, imgpoints, gray.shape[::-1], None, None)
+
+    # Each image is undistorted independently, so spread them across processes
+    with ProcessPoolExecutor(initializer=_init_worker, initargs=(mtx, dist)) as executor:
+        list(executor.map(_undistort_one, zip(image_names, image_outputs)))
@@ -3,15 +3,25 @@ import cv2 as cv
 import numpy as np
 import argparse
 from photos_height import *
+from _image_cache import get_image, dump_image
+
+
+def adjust_contrast(img, alpha, beta):
+    """Saturating alpha * pixel + beta on a uint8 image"""
+    if alpha == 1:
+        # Pure brightness shift: a saturating uint8 add
+        return cv.add(img, (beta, beta, beta, 0))
+    # Otherwise map every possible pixel value once through a 256-entry table
+    lut = np.clip(alpha * np.arange(256) + beta, 0, 255).astype(np.uint8)
+    return cv.LUT(img, lut)
+
 
 # Read image given by user
 
 
-image = cv.imread(front_input_image)
-new_image = np.zeros(image.shape, image.dtype)
+image = get_image(front_input_image)
 
-image_side = cv.imread(side_input_image)
-new_image_side = np.zeros(image_side.shape, image_side.dtype)
+image_side = get_image(side_input_image)
 
 alpha = 1.0  #contrast
 beta = 0 #brightness
@@ -23,18 +33,12 @@ except ValueError:
     print('Error, not a number')
 
 
-for y in range(image.shape[0]):
-    for x in range(image.shape[1]):
-        for c in range(image.shape[2]):
-            new_image[y, x, c] = np.clip(alpha * image[y, x, c] + beta, 0, 255)
+new_image = adjust_contrast(image, alpha, beta)
 
-cv.imwrite('images/degrease_contrast.jpg', new_image)
-print("degrease contrast and saved on degrease_contrast.jpg")
+dump_image('images/degrease_contrast.jpg', new_image)
+print("degrease contrast and handed the front image to background removal")
 
-for y in range(image_side.shape[0]):
-    for x in range(image_side.shape[1]):
-        for c in range(image_side.shape[2]):
-            new_image_side[y, x, c] = np.clip(alpha * image_side[y, x, c] + beta, 0, 255)
+new_image_side = adjust_contrast(image_side, alpha, beta)
 
-cv.imwrite('images/degrease_contrast_side.jpg', new_image_side)
-print("degrease contrast and saved on degrease_contrast_side.jpg")
\ No newline at end of file
+dump_image('images/degrease_contrast_side.jpg', new_image_side)
+print("degrease contrast and handed the side image to background removal")
\ No newline at end of file
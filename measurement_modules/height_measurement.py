@@ -2,9 +2,17 @@
 
 import cv2
 import numpy as np
+import statistics
+from operator import attrgetter
 import mediapipe as mp
 from math import sqrt
 from measurement_config import MeasurementConfig
+from _image_cache import get_image
+from _pose_cache import get_pose
+from _result_cache import cached_array
+
+# Pulls (x, y) out of a MediaPipe landmark without a per-attribute lookup in Python
+_landmark_xy = attrgetter('x', 'y')
 
 class HeightMeasurement:
     def __init__(self, front_image_path, side_image_path):
@@ -12,7 +20,9 @@ class HeightMeasurement:
         self.side_image = side_image_path
         self.config = MeasurementConfig()
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose()
+        # Shared with the pose stage of the pipeline, so the model is loaded once per process
+        self.pose = get_pose()
+        self._landmark_cache = {}
         
     def measure_height(self):
         """Main method to get height based on body proportions"""
@@ -60,30 +70,50 @@ class HeightMeasurement:
                 continue
         
         if heights:
-            median_height = np.median(heights)
+            median_height = statistics.median(heights)
             print(f"Median height from all methods: {median_height:.1f} cm")
             return median_height
         
         return None
     
+    def _get_landmarks(self, image_path):
+        """Run pose detection once per image and return (landmark (x, y) array, image shape)"""
+        if image_path not in self._landmark_cache:
+            img = get_image(image_path)
+            inference_width = self.config.POSE_INFERENCE_WIDTH
+            tag = f"pose-w{inference_width}-{'x'.join(map(str, img.shape))}"
+            landmarks = cached_array(tag, img, lambda: self._detect_landmarks(img, inference_width))
+            # An empty array records that no person was found
+            self._landmark_cache[image_path] = (landmarks if len(landmarks) else None, img.shape)
+        return self._landmark_cache[image_path]
+    
+    def _detect_landmarks(self, img, inference_width):
+        """Normalized (x, y) of every pose landmark as one array, indexed by landmark id"""
+        # Landmarks come back normalized, so they are detected on a smaller copy and
+        # scaled by the original shape afterwards
+        small = img
+        image_height, image_width = img.shape[:2]
+        if image_width > inference_width:
+            small = cv2.resize(img, (inference_width, int(image_height * inference_width / image_width)),
+                               interpolation=cv2.INTER_AREA)
+        # Channel-reversed view of the BGR image; MediaPipe needs a C-contiguous buffer
+        image_rgb = np.ascontiguousarray(small[:, :, ::-1])
+        result = self.pose.process(image_rgb)
+        if not result.pose_landmarks:
+            return np.empty((0, 2), dtype=np.float64)
+        return np.array(list(map(_landmark_xy, result.pose_landmarks.landmark)), dtype=np.float64)
+    
     def calculate_height_from_proportions(self):
         """Calculate height using standard body proportions"""
-        img = cv2.imread(self.front_image)
-        image_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = self.pose.process(image_rgb)
+        landmarks, image_shape = self._get_landmarks(self.front_image)
         
-        if not result.pose_landmarks:
+        if landmarks is None:
             return None
             
-        height, width, _ = img.shape
-        landmarks = result.pose_landmarks.landmark
+        height, width, _ = image_shape
         
         # Get key points in pixels
-        nose_y = landmarks[0].y * height
-        left_ankle_y = landmarks[27].y * height
-        left_heel_y = landmarks[29].y * height
-        left_hip_y = landmarks[23].y * height
-        left_shoulder_y = landmarks[11].y * height
+        nose_y, left_ankle_y, left_heel_y, left_hip_y, left_shoulder_y = landmarks[[0, 27, 29, 23, 11], 1] * height
         
         # Calculate body segments in pixels
         total_height_pixels = abs(left_heel_y - nose_y)
@@ -96,58 +126,47 @@ class HeightMeasurement:
         height_from_torso = (torso_length_pixels / 0.30) * 170 / total_height_pixels
         
         adjusted_total_pixels = total_height_pixels + head_to_nose_pixels
-        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(adjusted_total_pixels, img.shape)
+        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(adjusted_total_pixels, height)
         height_from_total = adjusted_total_pixels * pixel_to_cm_ratio
         
         heights = [h for h in [height_from_legs, height_from_torso, height_from_total] 
                   if 90 <= h <= 220]
         
         if heights:
-            return np.mean(heights)
+            return statistics.fmean(heights)
         
         return None
     
     def calculate_height_from_head_ratio(self):
         """Calculate height using head-to-body ratio"""
-        img = cv2.imread(self.front_image)
-        image_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = self.pose.process(image_rgb)
+        landmarks, image_shape = self._get_landmarks(self.front_image)
         
-        if not result.pose_landmarks:
+        if landmarks is None:
             return None
             
-        height, width, _ = img.shape
-        landmarks = result.pose_landmarks.landmark
+        height, width, _ = image_shape
         
-        nose_y = landmarks[0].y * height
-        mouth_y = landmarks[10].y * height
-        left_eye_y = landmarks[2].y * height
+        nose_y, mouth_y, left_eye_y = landmarks[[0, 10, 2], 1] * height
         
         face_height_pixels = abs(mouth_y - left_eye_y)
         head_height_pixels = face_height_pixels * 2
         estimated_height_pixels = head_height_pixels * 7.75
         
-        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(estimated_height_pixels, img.shape)
+        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(estimated_height_pixels, height)
         height_cm = estimated_height_pixels * pixel_to_cm_ratio
         
         return height_cm if 90 <= height_cm <= 220 else None
     
     def calculate_height_from_arm_span(self):
         """Calculate height from arm span"""
-        img = cv2.imread(self.front_image)
-        image_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = self.pose.process(image_rgb)
+        landmarks, image_shape = self._get_landmarks(self.front_image)
         
-        if not result.pose_landmarks:
+        if landmarks is None:
             return None
             
-        height, width, _ = img.shape
-        landmarks = result.pose_landmarks.landmark
+        height, width, _ = image_shape
         
-        left_wrist_x = landmarks[15].x * width
-        right_wrist_x = landmarks[16].x * width
-        left_shoulder_x = landmarks[11].x * width
-        right_shoulder_x = landmarks[12].x * width
+        left_wrist_x, right_wrist_x, left_shoulder_x, right_shoulder_x = landmarks[[15, 16, 11, 12], 0] * width
         
         wrist_span_pixels = abs(right_wrist_x - left_wrist_x)
         shoulder_span_pixels = abs(right_shoulder_x - left_shoulder_x)
@@ -155,26 +174,21 @@ class HeightMeasurement:
         estimated_hand_length = shoulder_span_pixels * 0.15
         full_arm_span_pixels = wrist_span_pixels + (2 * estimated_hand_length)
         
-        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(full_arm_span_pixels, img.shape)
+        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(full_arm_span_pixels, height)
         height_cm = full_arm_span_pixels * pixel_to_cm_ratio
         
         return height_cm if 90 <= height_cm <= 220 else None
     
     def calculate_height_from_leg_ratio(self):
         """Calculate height from leg measurements"""
-        img = cv2.imread(self.front_image)
-        image_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = self.pose.process(image_rgb)
+        landmarks, image_shape = self._get_landmarks(self.front_image)
         
-        if not result.pose_landmarks:
+        if landmarks is None:
             return None
             
-        height, width, _ = img.shape
-        landmarks = result.pose_landmarks.landmark
+        height, width, _ = image_shape
         
-        left_heel_y = landmarks[29].y * height
-        left_hip_y = landmarks[23].y * height
-        left_knee_y = landmarks[25].y * height
+        left_heel_y, left_hip_y, left_knee_y = landmarks[[29, 23, 25], 1] * height
         
         inseam_pixels = abs(left_heel_y - left_hip_y)
         thigh_pixels = abs(left_hip_y - left_knee_y)
@@ -184,7 +198,7 @@ class HeightMeasurement:
         height_from_thigh = thigh_pixels / 0.23
         height_from_shin = shin_pixels / 0.22
         
-        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(height_from_inseam, img.shape)
+        pixel_to_cm_ratio = self.estimate_pixel_to_cm_ratio(height_from_inseam, height)
         
         heights = []
         for h in [height_from_inseam, height_from_thigh, height_from_shin]:
@@ -192,11 +206,11 @@ class HeightMeasurement:
             if 90 <= height_cm <= 220:
                 heights.append(height_cm)
         
-        return np.mean(heights) if heights else None
+        return statistics.fmean(heights) if heights else None
     
-    def estimate_pixel_to_cm_ratio(self, height_pixels, image_shape):
+    @staticmethod
+    def estimate_pixel_to_cm_ratio(height_pixels, image_height):
         """Estimate pixel to cm conversion ratio"""
-        image_height = image_shape[0]
         fill_ratio = height_pixels / image_height
         
         if fill_ratio < 0.5:
@@ -206,10 +220,8 @@ class HeightMeasurement:
         else:
             scale_factor = 1.0
         
-        base_ratio = 170 / 1000
-        adjusted_ratio = base_ratio * scale_factor
-        
-        return adjusted_ratio
+        # 170 cm over 1000 px
+        return 0.17 * scale_factor
     
     def get_manual_height(self):
         """Get height manually with validation"""
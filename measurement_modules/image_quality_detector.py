@@ -3,11 +3,20 @@
 import cv2
 import numpy as np
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 class ImageQualityDetector:
     """Smart image quality detector that only flags genuine issues and returns clean JSON"""
     
+    # Per-image results keyed by (path, mtime_ns, size, image type), shared by all instances
+    # since the worker creates a new detector per job; least recently used entries are evicted
+    _analysis_cache = OrderedDict()
+    _analysis_cache_size = 64
+    _analysis_cache_lock = threading.Lock()
+    
     def __init__(self):
         self.detected_issue = None
     
@@ -16,9 +25,12 @@ class ImageQualityDetector:
         
         print(f"[IMAGE QUALITY] Analyzing image quality...")
         
-        # Analyze both images for SEVERE issues only
-        front_issue = self._analyze_image_for_severe_issues(front_image_path, "front")
-        side_issue = self._analyze_image_for_severe_issues(side_image_path, "side")
+        # Analyze both images for SEVERE issues only; the OpenCV work releases the GIL,
+        # so the two independent analyses run side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            front_future = executor.submit(self._analyze_image_cached, front_image_path, "front")
+            side_future = executor.submit(self._analyze_image_cached, side_image_path, "side")
+            front_issue, side_issue = front_future.result(), side_future.result()
         
         # Determine the PRIMARY issue (only return ONE issue type)
         primary_issue = self._determine_primary_issue(front_issue, side_issue)
@@ -44,31 +56,49 @@ class ImageQualityDetector:
         
         return result
     
+    def _analyze_image_cached(self, image_path: str, image_type: str) -> Dict:
+        """Return the analysis of an unchanged file from the cache, analyzing it otherwise"""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return self._analyze_image_for_severe_issues(image_path, image_type)
+        
+        key = (image_path, stat.st_mtime_ns, stat.st_size, image_type)
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(key)
+                return dict(cached)
+        
+        result = self._analyze_image_for_severe_issues(image_path, image_type)
+        # Processing errors may be transient, so only settled results are kept
+        if result['type'] != 'Processing Error':
+            with self._analysis_cache_lock:
+                self._analysis_cache[key] = dict(result)
+                while len(self._analysis_cache) > self._analysis_cache_size:
+                    self._analysis_cache.popitem(last=False)
+        return result
+    
     def _analyze_image_for_severe_issues(self, image_path: str, image_type: str) -> Dict:
         """Analyze image for SEVERE issues only - very strict thresholds"""
         
-        if not os.path.exists(image_path):
-            return {
-                'type': 'File Error',
-                'has_issue': True,
-                'severity': 'high',
-                'description': f'{image_type} image file not found',
-                'image': image_type
-            }
-        
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
+            # Load image; every check works on grayscale, so decode straight to one channel
+            gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                # Only a failed read pays for the existence check that picks the message
+                if not os.path.exists(image_path):
+                    description = f'{image_type} image file not found'
+                else:
+                    description = f'Cannot read {image_type} image file'
                 return {
                     'type': 'File Error',
                     'has_issue': True,
                     'severity': 'high',
-                    'description': f'Cannot read {image_type} image file',
+                    'description': description,
                     'image': image_type
                 }
             
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             height, width = gray.shape
             
             # Check for SEVERE lighting issues ONLY (very strict)
@@ -76,13 +106,20 @@ class ImageQualityDetector:
             if lighting_issue['has_issue']:
                 return lighting_issue
             
+            # The edge-based checks only compare coverage ratios, so they run on a small copy
+            small_gray = self._downscale(gray)
+            
+            # One edge pass serves both checks; 40/120 sits between the 50/150 and 30/100
+            # Canny thresholds the two checks used to run separately
+            largest_box = self._largest_edge_box(small_gray, 40, 120)
+            
             # Check for SEVERE positioning issues ONLY (very strict)
-            positioning_issue = self._check_severe_positioning_only(image, gray, image_type)
+            positioning_issue = self._check_severe_positioning_only(largest_box, small_gray.shape, image_type)
             if positioning_issue['has_issue']:
                 return positioning_issue
             
             # Check for SEVERE body detection issues ONLY (very strict)
-            body_issue = self._check_severe_body_detection_only(gray, image_type)
+            body_issue = self._check_severe_body_detection_only(largest_box, small_gray.shape, image_type)
             if body_issue['has_issue']:
                 return body_issue
             
@@ -104,12 +141,24 @@ class ImageQualityDetector:
                 'image': image_type
             }
     
+    def _downscale(self, gray_image: np.ndarray, max_dim: int = 512) -> np.ndarray:
+        """Shrink the image so its longest edge is at most max_dim pixels"""
+        height, width = gray_image.shape
+        scale = max_dim / max(height, width)
+        if scale >= 1:
+            return gray_image
+        return cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
     def _check_severe_lighting_only(self, gray_image: np.ndarray, image_type: str) -> Dict:
         """Only flag EXTREMELY SEVERE lighting problems"""
-        mean_brightness = np.mean(gray_image)
+        # Integer brightness histogram; the checks look at how much of the image sits in the
+        # extreme tails, which a few very bright or dark regions cannot skew the way they skew a mean
+        hist = cv2.calcHist([gray_image], [0], None, [256], [0, 256]).ravel()
+        dark_fraction = hist[:15].sum() / gray_image.size
+        bright_fraction = hist[251:].sum() / gray_image.size
         
         # Only flag extreme cases - much stricter than before
-        if mean_brightness < 15:  # Almost completely black
+        if dark_fraction > 0.95:  # Almost completely black
             return {
                 'type': 'Lighting Issue Detected',
                 'has_issue': True,
@@ -117,7 +166,7 @@ class ImageQualityDetector:
                 'description': 'Image is extremely dark - increase lighting significantly',
                 'image': image_type
             }
-        elif mean_brightness > 250:  # Almost completely white
+        elif bright_fraction > 0.95:  # Almost completely white
             return {
                 'type': 'Lighting Issue Detected',
                 'has_issue': True,
@@ -134,15 +183,27 @@ class ImageQualityDetector:
             'image': image_type
         }
     
-    def _check_severe_positioning_only(self, image: np.ndarray, gray_image: np.ndarray, image_type: str) -> Dict:
-        """Only flag EXTREMELY SEVERE positioning problems"""
-        height, width = gray_image.shape
+    def _largest_edge_box(self, gray_image: np.ndarray, low_threshold: int, high_threshold: int):
+        """
+        Bounding box (x, y, w, h) of the largest connected edge outline, or None when there are no edges.
+        Each external contour of the edge map is one 8-connected edge component, so the component
+        stats give the same boxes as findContours + boundingRect without tracing any contours.
+        """
+        edges = cv2.Canny(gray_image, low_threshold, high_threshold)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(edges, connectivity=8)
+        if count < 2:
+            return None
         
-        # Use edge detection to find subject
-        edges = cv2.Canny(gray_image, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Skip label 0 (no edge) and pick the component with the largest box
+        boxes = stats[1:, :4]
+        x, y, w, h = boxes[np.argmax(boxes[:, 2] * boxes[:, 3])]
+        return int(x), int(y), int(w), int(h)
+    
+    def _check_severe_positioning_only(self, largest_box, image_shape, image_type: str) -> Dict:
+        """Only flag EXTREMELY SEVERE positioning problems"""
+        height, width = image_shape
         
-        if not contours:
+        if largest_box is None:
             return {
                 'type': 'Positioning Adjustment Needed',
                 'has_issue': True,
@@ -151,9 +212,8 @@ class ImageQualityDetector:
                 'image': image_type
             }
         
-        # Find largest contour (person)
-        largest_contour = max(contours, key=cv2.contourArea)
-        x, y, w, h = cv2.boundingRect(largest_contour)
+        # Largest outline (person)
+        x, y, w, h = largest_box
         
         # Only flag EXTREME positioning issues - much stricter
         person_area_ratio = (w * h) / (width * height)
@@ -183,15 +243,11 @@ class ImageQualityDetector:
             'image': image_type
         }
     
-    def _check_severe_body_detection_only(self, gray_image: np.ndarray, image_type: str) -> Dict:
+    def _check_severe_body_detection_only(self, largest_box, image_shape, image_type: str) -> Dict:
         """Only flag EXTREMELY SEVERE body detection problems"""
-        height, width = gray_image.shape
-        
-        # Use edge detection
-        edges = cv2.Canny(gray_image, 30, 100)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        height, width = image_shape
         
-        if not contours:
+        if largest_box is None:
             return {
                 'type': 'Full Body Not Detected',
                 'has_issue': True,
@@ -200,9 +256,8 @@ class ImageQualityDetector:
                 'image': image_type
             }
         
-        # Get largest contour
-        largest_contour = max(contours, key=cv2.contourArea)
-        x, y, w, h = cv2.boundingRect(largest_contour)
+        # Get largest outline
+        x, y, w, h = largest_box
         
         # Only flag if EXTREMELY severely cropped - much stricter
         height_coverage = h / height
@@ -2,93 +2,138 @@
 
 import numpy as np
 import math
+from functools import lru_cache
 from typing import Tuple
 
+# Body-part specific corrections applied to diameter-based circumferences
+DIAMETER_CORRECTIONS = {
+    'wrist': 0.95,
+    'ankle': 0.93,
+    'neck': 0.98,
+    'bicep': 1.05,
+    'forearm': 1.02,
+    'calf': 1.08,
+    'thigh': 1.10,
+}
+
+# Cross-section shape of each limb: side-width weight and muscle correction
+LIMB_SHAPE_FACTORS = {
+    'upper_arm': {'ellipse_ratio': 0.85, 'muscle_factor': 1.1},
+    'forearm': {'ellipse_ratio': 0.75, 'muscle_factor': 1.05},
+    'thigh': {'ellipse_ratio': 0.80, 'muscle_factor': 1.15},
+    'calf': {'ellipse_ratio': 0.70, 'muscle_factor': 1.12},
+}
+
+# (front width, side width) scaling per torso part
+TORSO_WIDTH_FACTORS = {
+    'chest': (1.05, 0.95),
+    'waist': (1.0, 0.90),
+    'hip': (1.02, 1.05),
+}
+
+
+# The formulas are pure, so repeated calls with the same widths (the validation and
+# confidence passes re-evaluate the same body parts) are served from these caches
+
+@lru_cache(maxsize=256)
+def _circumference_from_ellipse(width_front, width_side):
+    a = width_front / 2
+    b = width_side / 2
+
+    h = ((a - b) ** 2) / ((a + b) ** 2)
+    return math.pi * (a + b) * (1 + (3 * h) / (10 + math.sqrt(4 - 3 * h)))
+
+
+@lru_cache(maxsize=256)
+def _circumference_from_diameter(diameter, body_part):
+    circumference = diameter * math.pi
+    if body_part and body_part in DIAMETER_CORRECTIONS:
+        circumference *= DIAMETER_CORRECTIONS[body_part]
+    return circumference
+
+
+@lru_cache(maxsize=256)
+def _limb_circumference(front_width, side_width, limb_type):
+    if limb_type in LIMB_SHAPE_FACTORS:
+        factors = LIMB_SHAPE_FACTORS[limb_type]
+        avg_diameter = (front_width + side_width * factors['ellipse_ratio']) / 2
+        base_circumference = avg_diameter * math.pi
+        return base_circumference * factors['muscle_factor']
+
+    return _circumference_from_ellipse(front_width, side_width)
+
+
+def _limb_circumferences(front_widths, side_widths, limb_types):
+    front_widths = np.asarray(front_widths, dtype=np.float64)
+    side_widths = np.asarray(side_widths, dtype=np.float64)
+
+    # Per-limb shape factors; NaN marks limbs without one, which fall back to the ellipse formula
+    ellipse_ratio = np.array([LIMB_SHAPE_FACTORS.get(t, {}).get('ellipse_ratio', np.nan) for t in limb_types])
+    muscle_factor = np.array([LIMB_SHAPE_FACTORS.get(t, {}).get('muscle_factor', np.nan) for t in limb_types])
+
+    shaped = (front_widths + side_widths * ellipse_ratio) / 2 * math.pi * muscle_factor
+
+    a = front_widths / 2
+    b = side_widths / 2
+    h = ((a - b) ** 2) / ((a + b) ** 2)
+    ellipse = math.pi * (a + b) * (1 + (3 * h) / (10 + np.sqrt(4 - 3 * h)))
+
+    return np.where(np.isnan(ellipse_ratio), ellipse, shaped)
+
+
+@lru_cache(maxsize=256)
+def _torso_circumference(front_width, side_width, torso_part):
+    if torso_part in TORSO_WIDTH_FACTORS:
+        front_factor, side_factor = TORSO_WIDTH_FACTORS[torso_part]
+        return _circumference_from_ellipse(front_width * front_factor, side_width * side_factor)
+    return _circumference_from_ellipse(front_width, side_width)
+
+
+@lru_cache(maxsize=256)
+def _body_fat_percentage(waist, neck, height, hip, gender):
+    if gender == 'male':
+        body_fat = 86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76
+    else:
+        if hip:
+            body_fat = 163.205 * math.log10(waist + hip - neck) - 97.684 * math.log10(height) - 78.387
+        else:
+            body_fat = 86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76
+
+    return max(2, min(50, body_fat))
+
+
 class MeasurementCalculator:
     """Calculate body measurements using improved formulas"""
     
     @staticmethod
     def calculate_circumference_from_ellipse(width_front: float, width_side: float) -> float:
         """Calculate circumference using Ramanujan's approximation for ellipse perimeter"""
-        a = width_front / 2
-        b = width_side / 2
-        
-        h = ((a - b) ** 2) / ((a + b) ** 2)
-        perimeter = math.pi * (a + b) * (1 + (3 * h) / (10 + math.sqrt(4 - 3 * h)))
-        
-        return perimeter
+        return _circumference_from_ellipse(width_front, width_side)
     
     @staticmethod
     def calculate_circumference_from_diameter(diameter: float, body_part: str = None) -> float:
         """Calculate circumference with body-part specific corrections"""
-        circumference = diameter * math.pi
-        
-        corrections = {
-            'wrist': 0.95,
-            'ankle': 0.93,
-            'neck': 0.98,
-            'bicep': 1.05,
-            'forearm': 1.02,
-            'calf': 1.08,
-            'thigh': 1.10,
-        }
-        
-        if body_part and body_part in corrections:
-            circumference *= corrections[body_part]
-        
-        return circumference
+        return _circumference_from_diameter(diameter, body_part)
     
     @staticmethod
-    def calculate_limb_circumference(front_width: float, side_width: float, 
+    def calculate_limb_circumference(front_width: float, side_width: float,
                                    limb_type: str) -> float:
         """Calculate limb circumference with anatomical corrections"""
-        shape_factors = {
-            'upper_arm': {'ellipse_ratio': 0.85, 'muscle_factor': 1.1},
-            'forearm': {'ellipse_ratio': 0.75, 'muscle_factor': 1.05},
-            'thigh': {'ellipse_ratio': 0.80, 'muscle_factor': 1.15},
-            'calf': {'ellipse_ratio': 0.70, 'muscle_factor': 1.12},
-        }
-        
-        if limb_type in shape_factors:
-            factors = shape_factors[limb_type]
-            avg_diameter = (front_width + side_width * factors['ellipse_ratio']) / 2
-            base_circumference = avg_diameter * math.pi
-            return base_circumference * factors['muscle_factor']
-        
-        return MeasurementCalculator.calculate_circumference_from_ellipse(front_width, side_width)
+        return _limb_circumference(front_width, side_width, limb_type)
+    
+    @staticmethod
+    def calculate_limb_circumferences_batch(front_widths, side_widths, limb_types) -> np.ndarray:
+        """Vectorized calculate_limb_circumference over parallel sequences of widths and limb types"""
+        return _limb_circumferences(front_widths, side_widths, limb_types)
     
     @staticmethod
-    def calculate_torso_circumference(front_width: float, side_width: float, 
+    def calculate_torso_circumference(front_width: float, side_width: float,
                                     torso_part: str) -> float:
         """Calculate torso measurements with anatomical considerations"""
-        if torso_part == 'chest':
-            return MeasurementCalculator.calculate_circumference_from_ellipse(
-                front_width * 1.05,
-                side_width * 0.95
-            )
-        elif torso_part == 'waist':
-            return MeasurementCalculator.calculate_circumference_from_ellipse(
-                front_width,
-                side_width * 0.90
-            )
-        elif torso_part == 'hip':
-            return MeasurementCalculator.calculate_circumference_from_ellipse(
-                front_width * 1.02,
-                side_width * 1.05
-            )
-        else:
-            return MeasurementCalculator.calculate_circumference_from_ellipse(front_width, side_width)
+        return _torso_circumference(front_width, side_width, torso_part)
     
     @staticmethod
-    def estimate_body_fat_percentage(waist: float, neck: float, height: float, 
+    def estimate_body_fat_percentage(waist: float, neck: float, height: float,
                                     hip: float = None, gender: str = 'male') -> float:
         """Estimate body fat percentage using Navy method"""
-        if gender == 'male':
-            body_fat = 86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76
-        else:
-            if hip:
-                body_fat = 163.205 * math.log10(waist + hip - neck) - 97.684 * math.log10(height) - 78.387
-            else:
-                body_fat = 86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76
-        
-        return max(2, min(50, body_fat))
+        return _body_fat_percentage(waist, neck, height, hip, gender)
@@ -3,44 +3,77 @@
 import numpy as np
 from typing import Dict, List
 
+def _range_table(names, expected_ranges, height_proportions):
+    """Stack the range tables into rows of (min, max, min ratio, max ratio), plus a trailing NaN row"""
+    rows = [(*expected_ranges.get(name, (np.nan, np.nan)), *height_proportions.get(name, (np.nan, np.nan)))
+            for name in names]
+    return np.array(rows + [(np.nan,) * 4], dtype=np.float64)
+
 class MeasurementConfidence:
     """Assess confidence in measurements based on various factors"""
     
+    _EXPECTED_RANGES = {
+        'Waist Circumference': (60, 120),
+        'Chest Circumference': (75, 130),
+        'Hip Circumference': (80, 130),
+        'Neck Circumference': (30, 50),
+        'Head Circumference': (50, 65),
+        'Left Thigh Circumference': (40, 75),
+        'Left Calf Circumference': (28, 50),
+        'Right Wrist Circumference': (14, 22),
+        'Right Bicep Circumference': (25, 45),
+        'Right Forearm Circumference': (20, 35),
+        'Left Ankle Circumference': (18, 30),
+        'Shoulder Breadth': (35, 55),
+    }
+    
+    _HEIGHT_PROPORTIONS = {
+        'Waist Circumference': (0.38, 0.55),
+        'Chest Circumference': (0.50, 0.70),
+        'Hip Circumference': (0.50, 0.70),
+        'Neck Circumference': (0.20, 0.28),
+    }
+    
+    # Both tables as parallel arrays: row i holds (min, max, min ratio, max ratio) of the i-th name,
+    # NaN where a table has no entry. The extra last row is all NaN for names in neither table.
+    _TABLE_NAMES = list(dict.fromkeys([*_EXPECTED_RANGES, *_HEIGHT_PROPORTIONS]))
+    _TABLE_INDEX = {name: i for i, name in enumerate(_TABLE_NAMES)}
+    _TABLE = _range_table(_TABLE_NAMES, _EXPECTED_RANGES, _HEIGHT_PROPORTIONS)
+    
     def __init__(self, height: float):
         self.height = height
         
     def calculate_confidence_score(self, measurements: Dict) -> Dict:
         """Calculate confidence scores for each measurement"""
-        confidence_scores = {}
+        # Numbers only: "N/A" strings are skipped by the type check, and booleans are not measurements
+        names = [key for key, value in measurements.items()
+                 if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if not names:
+            return {}
         
-        for key, value in measurements.items():
-            if isinstance(value, (int, float)) and value != "N/A":
-                score = self.evaluate_measurement(key, value)
-                confidence_scores[key] = score
+        values = np.array([measurements[name] for name in names], dtype=np.float64)
+        rows = self._TABLE[[self._TABLE_INDEX.get(name, -1) for name in names]]
+        min_val, max_val, min_ratio, max_ratio = rows.T
         
-        return confidence_scores
+        # Same rules as evaluate_measurement, applied to all measurements at once;
+        # comparisons against NaN are False, so names without a range are not penalized
+        deviation = np.where(values < min_val, (min_val - values) / min_val,
+                             np.where(values > max_val, (values - max_val) / max_val, 0.0))
+        scores = 100.0 - np.minimum(50, deviation * 100)
+        
+        ratio = values / self.height
+        outside_proportion = ~np.isnan(min_ratio) & ~((min_ratio <= ratio) & (ratio <= max_ratio))
+        scores -= 20 * outside_proportion
+        
+        return dict(zip(names, np.clip(scores, 0, 100).tolist()))
     
     def evaluate_measurement(self, measurement_name: str, value: float) -> float:
         """Evaluate confidence in a single measurement"""
         score = 100.0
         
-        expected_ranges = {
-            'Waist Circumference': (60, 120),
-            'Chest Circumference': (75, 130),
-            'Hip Circumference': (80, 130),
-            'Neck Circumference': (30, 50),
-            'Head Circumference': (50, 65),
-            'Left Thigh Circumference': (40, 75),
-            'Left Calf Circumference': (28, 50),
-            'Right Wrist Circumference': (14, 22),
-            'Right Bicep Circumference': (25, 45),
-            'Right Forearm Circumference': (20, 35),
-            'Left Ankle Circumference': (18, 30),
-            'Shoulder Breadth': (35, 55),
-        }
-        
-        if measurement_name in expected_ranges:
-            min_val, max_val = expected_ranges[measurement_name]
+        expected_range = self._EXPECTED_RANGES.get(measurement_name)
+        if expected_range:
+            min_val, max_val = expected_range
             if value < min_val or value > max_val:
                 if value < min_val:
                     deviation = (min_val - value) / min_val
@@ -48,15 +81,9 @@ class MeasurementConfidence:
                     deviation = (value - max_val) / max_val
                 score -= min(50, deviation * 100)
         
-        height_proportions = {
-            'Waist Circumference': (0.38, 0.55),
-            'Chest Circumference': (0.50, 0.70),
-            'Hip Circumference': (0.50, 0.70),
-            'Neck Circumference': (0.20, 0.28),
-        }
-        
-        if measurement_name in height_proportions:
-            min_ratio, max_ratio = height_proportions[measurement_name]
+        height_proportion = self._HEIGHT_PROPORTIONS.get(measurement_name)
+        if height_proportion:
+            min_ratio, max_ratio = height_proportion
             ratio = value / self.height
             if not (min_ratio <= ratio <= max_ratio):
                 score -= 20
@@ -68,8 +95,8 @@ class MeasurementConfidence:
         if not confidence_scores:
             return 0
         
-        scores = list(confidence_scores.values())
-        return np.mean(scores)
+        scores = confidence_scores.values()
+        return sum(scores) / len(scores)
     
     def get_recommendations(self, confidence_scores: Dict) -> List[str]:
         """Get recommendations for improving measurements"""
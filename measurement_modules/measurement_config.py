@@ -1,5 +1,7 @@
 # config.py
 
+import os
+
 class MeasurementConfig:
     """Configuration for body measurement system"""
     
@@ -22,6 +24,10 @@ class MeasurementConfig:
     MIN_HUMAN_HEIGHT = 90   # Minimum realistic human height
     MAX_HUMAN_HEIGHT = 220  # Maximum realistic human height
     
+    # Pose detection settings
+    POSE_INFERENCE_WIDTH = 640  # Wider images are downscaled to this width before landmark detection
+    SIDE_POSE_MODEL_COMPLEXITY = int(os.getenv('SIDE_POSE_MODEL_COMPLEXITY', 0))  # 0 = BlazePose Lite for the side photo
+    
     # Reference object settings (if using reference-based detection)
     REFERENCE_OBJECT = {
         "type": "ruler",  # Options: "ruler", "marker", "checkerboard"
@@ -6,6 +6,26 @@ from typing import Dict, Tuple, List
 class MeasurementValidator:
     """Validates and corrects body measurements using anthropometric rules"""
     
+    # Report names -> keys of the anthropometric ratio table
+    _VALIDATION_KEY_MAP = {
+        'Head Circumference': 'head_circumference',
+        'Neck Circumference': 'neck_circumference',
+        'Chest Circumference': 'chest_circumference',
+        'Waist Circumference': 'waist_circumference',
+        'Hip Circumference': 'hip_circumference',
+        'Shoulder Breadth': 'shoulder_breadth',
+        'Right Arm Length': 'arm_length',
+        'Right Bicep Circumference': 'upper_arm_circumference',
+        'Right Forearm Circumference': 'forearm_circumference',
+        'Right Wrist Circumference': 'wrist_circumference',
+        'Left Thigh Circumference': 'thigh_circumference',
+        'Left Calf Circumference': 'calf_circumference',
+        'Left Ankle Circumference': 'ankle_circumference',
+        'Inside Leg Height': 'inseam',
+        'Right Foot Length': 'foot_length',
+        'Right Foot Width': 'foot_width',
+    }
+    
     def __init__(self, height_cm: float):
         self.height = height_cm
         self.setup_anthropometric_ratios()
@@ -37,6 +57,10 @@ class MeasurementValidator:
             'thigh_to_calf': (1.4, 1.8),
             'upper_arm_to_forearm': (1.1, 1.3),
         }
+        
+        # The ratio table as parallel arrays for validating all measurements at once
+        self.ratio_index = {name: i for i, name in enumerate(self.ratios)}
+        self.min_ratios, self.max_ratios = np.array(list(self.ratios.values()), dtype=np.float64).T
     
     def validate_measurement(self, measurement_name: str, value: float) -> Tuple[bool, float]:
         """Validate a single measurement and return corrected value if needed"""
@@ -54,23 +78,29 @@ class MeasurementValidator:
     
     def validate_all_measurements(self, measurements: Dict) -> Dict:
         """Validate and correct all measurements"""
-        corrected = {}
+        corrected = dict(measurements)
         corrections_made = []
         
+        # Numeric measurements that have an anthropometric range, with their row in the ratio table
+        keys, rows = [], []
         for key, value in measurements.items():
-            if isinstance(value, (int, float)) and value != "N/A":
-                validation_key = self.get_validation_key(key)
-                if validation_key:
-                    is_valid, corrected_value = self.validate_measurement(validation_key, value)
-                    if not is_valid:
-                        corrections_made.append(f"{key}: {value:.1f} -> {corrected_value:.1f}")
-                        corrected[key] = corrected_value
-                    else:
-                        corrected[key] = value
-                else:
-                    corrected[key] = value
-            else:
-                corrected[key] = value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                row = self.ratio_index.get(self._VALIDATION_KEY_MAP.get(key))
+                if row is not None:
+                    keys.append(key)
+                    rows.append(row)
+        
+        if keys:
+            values = np.array([measurements[key] for key in keys], dtype=np.float64)
+            min_ratios, max_ratios = self.min_ratios[rows], self.max_ratios[rows]
+            # Same bounds and midpoint as validate_measurement, for every measurement in one pass
+            is_valid = (self.height * min_ratios <= values) & (values <= self.height * max_ratios)
+            midpoints = self.height * (min_ratios + max_ratios) / 2
+            
+            for i in np.flatnonzero(~is_valid):
+                key, corrected_value = keys[i], float(midpoints[i])
+                corrections_made.append(f"{key}: {measurements[key]:.1f} -> {corrected_value:.1f}")
+                corrected[key] = corrected_value
         
         corrected = self.validate_relationships(corrected)
         
@@ -83,42 +113,20 @@ class MeasurementValidator:
     
     def get_validation_key(self, measurement_name: str) -> str:
         """Map measurement names to validation keys"""
-        mapping = {
-            'Head Circumference': 'head_circumference',
-            'Neck Circumference': 'neck_circumference',
-            'Chest Circumference': 'chest_circumference',
-            'Waist Circumference': 'waist_circumference',
-            'Hip Circumference': 'hip_circumference',
-            'Shoulder Breadth': 'shoulder_breadth',
-            'Right Arm Length': 'arm_length',
-            'Right Bicep Circumference': 'upper_arm_circumference',
-            'Right Forearm Circumference': 'forearm_circumference',
-            'Right Wrist Circumference': 'wrist_circumference',
-            'Left Thigh Circumference': 'thigh_circumference',
-            'Left Calf Circumference': 'calf_circumference',
-            'Left Ankle Circumference': 'ankle_circumference',
-            'Inside Leg Height': 'inseam',
-            'Right Foot Length': 'foot_length',
-            'Right Foot Width': 'foot_width',
-        }
-        return mapping.get(measurement_name, None)
+        return self._VALIDATION_KEY_MAP.get(measurement_name)
     
     def validate_relationships(self, measurements: Dict) -> Dict:
         """Validate measurement relationships"""
+        # Out-of-range ratios are clamped to the nearest allowed bound, and the measurement is
+        # rebuilt from the clamped ratio
         if 'Waist Circumference' in measurements and 'Hip Circumference' in measurements:
-            waist = measurements['Waist Circumference']
             hip = measurements['Hip Circumference']
-            ratio = waist / hip if hip > 0 else 0
-            
-            if not (0.65 <= ratio <= 0.95):
-                measurements['Waist Circumference'] = hip * 0.80
+            ratio = measurements['Waist Circumference'] / hip if hip > 0 else 0.80
+            measurements['Waist Circumference'] = hip * min(max(ratio, 0.65), 0.95)
         
         if 'Chest Circumference' in measurements and 'Waist Circumference' in measurements:
-            chest = measurements['Chest Circumference']
             waist = measurements['Waist Circumference']
-            ratio = chest / waist if waist > 0 else 0
-            
-            if not (1.15 <= ratio <= 1.45):
-                measurements['Chest Circumference'] = waist * 1.30
+            ratio = measurements['Chest Circumference'] / waist if waist > 0 else 1.30
+            measurements['Chest Circumference'] = waist * min(max(ratio, 1.15), 1.45)
         
         return measurements
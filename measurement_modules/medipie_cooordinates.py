@@ -1,10 +1,22 @@
 import cv2
+import os
+import numpy as np
 import mediapipe as mp
+from concurrent.futures import ThreadPoolExecutor
 from photos_height import *
+from measurement_config import MeasurementConfig
+from _image_cache import get_image
+from _pose_cache import get_pose
 
-# Initialize MediaPipe pose solution
+# Per-landmark coordinate dump, off unless POSE_DEBUG=true
+POSE_DEBUG = os.getenv('POSE_DEBUG', 'false').lower() == 'true'
+
+# MediaPipe pose solution; the Pose graphs are the process-wide static-image instances,
+# a separate one for the side photo so both can be processed at the same time. The side
+# photo only feeds a few lateral landmarks, so it runs the lighter model by default
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
+pose = get_pose()
+pose_side = get_pose(1, MeasurementConfig.SIDE_POSE_MODEL_COMPLEXITY)
 
 # Drawing utilities to visualize landmarks
 mp_drawing = mp.solutions.drawing_utils
@@ -26,29 +38,46 @@ landmark_names_side = {
     30: "Right Heel side", 31: "Left Foot Index side", 32: "Right Foot Index side"
 }
 
-image_front = cv2.imread(front_input_image)
-image_side = cv2.imread(side_input_image)
+# Landmarks are drawn onto these, so take copies of the shared decoded images
+image_front = get_image(front_input_image).copy()
+image_side = get_image(side_input_image).copy()
+
+
+def run_pose(image, pose):
+    """Detect pose landmarks on a BGR image with the given Pose instance"""
+    # Landmarks are normalized, so wide photos are shrunk before the channel swap
+    # and the results still scale by the original width/height
+    height, width = image.shape[:2]
+    inference_width = MeasurementConfig.POSE_INFERENCE_WIDTH
+    if width > inference_width:
+        image = cv2.resize(image, (inference_width, int(height * inference_width / width)),
+                           interpolation=cv2.INTER_AREA)
+    # Channel-reversed view of the BGR image; MediaPipe needs a C-contiguous buffer
+    return pose.process(np.ascontiguousarray(image[:, :, ::-1]))
 
-image_rgb_front = cv2.cvtColor(image_front, cv2.COLOR_BGR2RGB)
-image_rgb_side = cv2.cvtColor(image_side, cv2.COLOR_BGR2RGB)
 
-result_front = pose.process(image_rgb_front)
-result_side = pose.process(image_rgb_side)
+def landmarks_to_pixels(landmarks, width, height):
+    """(N, 2) integer pixel coordinates of normalized pose landmarks, truncated like int()"""
+    coords = np.fromiter((c for lm in landmarks for c in (lm.x, lm.y)), dtype=np.float64,
+                         count=2 * len(landmarks)).reshape(-1, 2)
+    return (coords * (width, height)).astype(np.int64)
+
+
+# Inference runs in native code outside the GIL, so the two photos are processed in parallel
+with ThreadPoolExecutor(max_workers=2) as executor:
+    future_front = executor.submit(run_pose, image_front, pose)
+    future_side = executor.submit(run_pose, image_side, pose_side)
+    result_front, result_side = future_front.result(), future_side.result()
 
 if result_front.pose_landmarks:
     mp_drawing.draw_landmarks(image_front, result_front.pose_landmarks, mp_pose.POSE_CONNECTIONS)
     height, width, _ = image_front.shape
 
-    # Print landmark coordinates with body part names
-    for id, landmark in enumerate(result_front.pose_landmarks.landmark):
-        x = int(landmark.x * width)
-        y = int(landmark.y * height)
-
-        # Get the corresponding body part name from the dictionary
-        body_part = landmark_names.get(id, "Unknown")
-
-        # Print the body part name and coordinates
-        print(f'{body_part}: (X: {x}, Y: {y})')
+    # Print landmark coordinates with body part names (debug only, as one write)
+    if POSE_DEBUG:
+        front_px = landmarks_to_pixels(result_front.pose_landmarks.landmark, width, height)
+        print("\n".join(f'{landmark_names.get(id, "Unknown")}: (X: {x}, Y: {y})'
+                        for id, (x, y) in enumerate(front_px.tolist())))
 
         #Display the image with pose landmarks
     #cv2.imshow('Pose Detection', image_front)
@@ -63,59 +92,24 @@ if result_front.pose_landmarks:
     height, width, _ = image_front.shape
 
 
-    # Convert normalized coordinates to pixel coordinates for each landmark
-    def get_coords(landmark):
-        return int(landmark.x * width), int(landmark.y * height)
-
+    # Convert normalized coordinates to pixel coordinates for all landmarks at once
     landmarks = result_front.pose_landmarks.landmark
-    nose = get_coords(landmarks[0])
-    left_eye_inner = get_coords(landmarks[1])
-    left_eye = get_coords(landmarks[2])
-    left_eye_outer = get_coords(landmarks[3])
-    right_eye_inner = get_coords(landmarks[4])
-    right_eye = get_coords(landmarks[5])
-    right_eye_outer = get_coords(landmarks[6])
-    left_ear = get_coords(landmarks[7])
-    right_ear = get_coords(landmarks[8])
-    mouth_left = get_coords(landmarks[9])
-    mouth_right = get_coords(landmarks[10])
-    left_shoulder = get_coords(landmarks[11])
-    right_shoulder = get_coords(landmarks[12])
-    left_elbow = get_coords(landmarks[13])
-    right_elbow = get_coords(landmarks[14])
-    left_wrist = get_coords(landmarks[15])
-    right_wrist = get_coords(landmarks[16])
-    left_pinky = get_coords(landmarks[17])
-    right_pinky = get_coords(landmarks[18])
-    left_index = get_coords(landmarks[19])
-    right_index = get_coords(landmarks[20])
-    left_thumb = get_coords(landmarks[21])
-    right_thumb = get_coords(landmarks[22])
-    left_hip = get_coords(landmarks[23])
-    right_hip = get_coords(landmarks[24])
-    left_knee = get_coords(landmarks[25])
-    right_knee = get_coords(landmarks[26])
-    left_ankle = get_coords(landmarks[27])
-    right_ankle = get_coords(landmarks[28])
-    left_heel = get_coords(landmarks[29])
-    right_heel = get_coords(landmarks[30])
-    left_foot_index = get_coords(landmarks[31])
-    right_foot_index = get_coords(landmarks[32])
+    landmarks_px = landmarks_to_pixels(landmarks, width, height)
+    (nose, left_eye_inner, left_eye, left_eye_outer, right_eye_inner, right_eye, right_eye_outer, left_ear,
+     right_ear, mouth_left, mouth_right, left_shoulder, right_shoulder, left_elbow, right_elbow, left_wrist,
+     right_wrist, left_pinky, right_pinky, left_index, right_index, left_thumb, right_thumb, left_hip,
+     right_hip, left_knee, right_knee, left_ankle, right_ankle, left_heel, right_heel, left_foot_index,
+     right_foot_index) = map(tuple, landmarks_px.tolist())
 
 if result_side.pose_landmarks:
     mp_drawing.draw_landmarks(image_side, result_side.pose_landmarks, mp_pose.POSE_CONNECTIONS)
     height_side, width_side, _ = image_side.shape
 
-    # Print landmark coordinates with body part names
-    for id, landmark in enumerate(result_side.pose_landmarks.landmark):
-        x_side = int(landmark.x * width_side)
-        y_side = int(landmark.y * height_side)
-
-        # Get the corresponding body part name from the dictionary
-        body_part_side = landmark_names_side.get(id, "Unknown")
-
-        # Print the body part name and coordinates
-        print(f'{body_part_side}: (X_side: {x_side}, Y_side: {y_side})')
+    # Print landmark coordinates with body part names (debug only, as one write)
+    if POSE_DEBUG:
+        side_px = landmarks_to_pixels(result_side.pose_landmarks.landmark, width_side, height_side)
+        print("\n".join(f'{landmark_names_side.get(id, "Unknown")}: (X_side: {x_side}, Y_side: {y_side})'
+                        for id, (x_side, y_side) in enumerate(side_px.tolist())))
 
         #Display the image with pose landmarks
     #cv2.imshow('Pose Detection', image_front)
@@ -130,44 +124,14 @@ if result_side.pose_landmarks:
     height_side, width_side, _ = image_side.shape
 
 
-    # Convert normalized coordinates to pixel coordinates for each landmark
-    def get_coords(landmark):
-        return int(landmark.x * width_side), int(landmark.y * height_side)
-
-
-    # Extract each joint by name
+    # Convert normalized coordinates to pixel coordinates for all landmarks at once
     landmarks_side = result_side.pose_landmarks.landmark
-    nose_side = get_coords(landmarks_side[0])
-    left_eye_inner_side = get_coords(landmarks_side[1])
-    left_eye_side = get_coords(landmarks_side[2])
-    left_eye_outer_side = get_coords(landmarks_side[3])
-    right_eye_inner_side = get_coords(landmarks_side[4])
-    right_eye_side = get_coords(landmarks_side[5])
-    right_eye_outer_side = get_coords(landmarks_side[6])
-    left_ear_side = get_coords(landmarks_side[7])
-    right_ear_side = get_coords(landmarks_side[8])
-    mouth_left_side = get_coords(landmarks_side[9])
-    mouth_right_side = get_coords(landmarks_side[10])
-    left_shoulder_side = get_coords(landmarks_side[11])
-    right_shoulder_side = get_coords(landmarks_side[12])
-    left_elbow_side = get_coords(landmarks_side[13])
-    right_elbow_side = get_coords(landmarks_side[14])
-    left_wrist_side = get_coords(landmarks_side[15])
-    right_wrist_side = get_coords(landmarks_side[16])
-    left_pinky_side = get_coords(landmarks_side[17])
-    right_pinky_side = get_coords(landmarks_side[18])
-    left_index_side = get_coords(landmarks_side[19])
-    right_index_side = get_coords(landmarks_side[20])
-    left_thumb_side = get_coords(landmarks_side[21])
-    right_thumb_side = get_coords(landmarks_side[22])
-    left_hip_side = get_coords(landmarks_side[23])
-    right_hip_side = get_coords(landmarks_side[24])
-    left_knee_side = get_coords(landmarks_side[25])
-    right_knee_side = get_coords(landmarks_side[26])
-    left_ankle_side = get_coords(landmarks_side[27])
-    right_ankle_side = get_coords(landmarks_side[28])
-    left_heel_side = get_coords(landmarks_side[29])
-    right_heel_side = get_coords(landmarks_side[30])
-    left_foot_index_side = get_coords(landmarks_side[31])
-    right_foot_index_side = get_coords(landmarks_side[32])
+    landmarks_side_px = landmarks_to_pixels(landmarks_side, width_side, height_side)
+    (nose_side, left_eye_inner_side, left_eye_side, left_eye_outer_side, right_eye_inner_side,
+     right_eye_side, right_eye_outer_side, left_ear_side, right_ear_side, mouth_left_side, mouth_right_side,
+     left_shoulder_side, right_shoulder_side, left_elbow_side, right_elbow_side, left_wrist_side,
+     right_wrist_side, left_pinky_side, right_pinky_side, left_index_side, right_index_side, left_thumb_side,
+     right_thumb_side, left_hip_side, right_hip_side, left_knee_side, right_knee_side, left_ankle_side,
+     right_ankle_side, left_heel_side, right_heel_side, left_foot_index_side,
+     right_foot_index_side) = map(tuple, landmarks_side_px.tolist())
 
@@ -1,7 +1,11 @@
 # photos_height.py
 
 import cv2
+import os
+import pickle
 import numpy as np
+from functools import lru_cache
+from _image_cache import get_image
 
 front_input_image = 'distance/img1.jpg'
 side_input_image = 'distance/img2.jpg'
@@ -15,13 +19,24 @@ height = MANUAL_HEIGHT
 # Reference object configuration (for automatic measurement)
 REFERENCE_OBJECT_HEIGHT_CM = 30  # Known height of reference object in cm
 REFERENCE_MARKER_COLOR = (0, 255, 0)  # Green marker for reference object
+ARUCO_SIZE_CM = 10  # Known ArUco marker size (e.g., 10cm x 10cm)
+
+# (image path, mtime) -> reference object pixel height from detect_reference_object
+_reference_cache = {}
 
 def detect_reference_object(image_path):
     """
     Detect a reference object in the image (e.g., a ruler, known-size marker)
     Returns the pixel height of the reference object
     """
-    img = cv2.imread(image_path)
+    key = (image_path, os.path.getmtime(image_path))
+    if key not in _reference_cache:
+        _reference_cache[key] = _find_reference_height(image_path)
+    return _reference_cache[key]
+
+def _find_reference_height(image_path):
+    """Uncached body of detect_reference_object"""
+    img = get_image(image_path)
     
     # Convert to HSV for better color detection
     hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
@@ -33,17 +48,36 @@ def detect_reference_object(image_path):
     # Create mask for reference object
     mask = cv2.inRange(hsv, lower_green, upper_green)
     
-    # Find contours
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # Label the green blobs; row 0 of stats is the background
+    num_labels, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
     
-    if contours:
-        # Find the largest contour (assumed to be reference object)
-        largest_contour = max(contours, key=cv2.contourArea)
-        x, y, w, h = cv2.boundingRect(largest_contour)
-        return h  # Return height in pixels
+    if num_labels > 1:
+        # Take the largest blob (assumed to be reference object)
+        largest = 1 + np.argmax(stats[1:, cv2.CC_STAT_AREA])
+        return int(stats[largest, cv2.CC_STAT_HEIGHT])  # Return height in pixels
     
     return None
 
+@lru_cache(maxsize=None)
+def _aruco_detect():
+    """
+    Marker detection function for DICT_6X6_250, with the dictionary and detector parameters
+    built once. Uses cv2.aruco.ArucoDetector on OpenCV >= 4.7 and the legacy functions before it.
+    """
+    aruco = cv2.aruco
+    aruco_dict = aruco.getPredefinedDictionary(aruco.DICT_6X6_250)
+    if hasattr(aruco, 'ArucoDetector'):
+        return aruco.ArucoDetector(aruco_dict, aruco.DetectorParameters()).detectMarkers
+    parameters = aruco.DetectorParameters_create()
+    return lambda gray: aruco.detectMarkers(gray, aruco_dict, parameters=parameters)
+
+def _person_height_pixels():
+    """Nose-to-heel pixel distance on the front photo, or None when no pose was found"""
+    from medipie_cooordinates import result_front, landmarks_px, mp_pose
+    if result_front and result_front.pose_landmarks:
+        return int(abs(landmarks_px[mp_pose.PoseLandmark.LEFT_HEEL, 1] - landmarks_px[mp_pose.PoseLandmark.NOSE, 1]))
+    return None
+
 def calculate_automatic_height(front_image_path, side_image_path):
     """
     Calculate person's height automatically using reference object
@@ -56,16 +90,14 @@ def calculate_automatic_height(front_image_path, side_image_path):
         pixels_per_cm = ref_height_pixels / REFERENCE_OBJECT_HEIGHT_CM
         
         # Get person's height in pixels (from pose landmarks)
-        from medipie_cooordinates import result_front, nose, left_heel
-        if result_front and result_front.pose_landmarks:
-            person_height_pixels = abs(left_heel[1] - nose[1])
-            calculated_height = person_height_pixels / pixels_per_cm
+        height_pixels = _person_height_pixels()
+        if height_pixels is not None:
+            calculated_height = height_pixels / pixels_per_cm
             return calculated_height
     
     # Method 2: Using camera calibration (if available)
     try:
         # Load camera calibration data
-        import pickle
         with open('camera_calibration_data.pkl', 'rb') as f:
             calib_data = pickle.load(f)
             # Use calibration data to estimate real-world height
@@ -75,30 +107,22 @@ def calculate_automatic_height(front_image_path, side_image_path):
             
             if focal_length and camera_distance:
                 # Calculate height using similar triangles
-                from medipie_cooordinates import result_front, nose, left_heel
-                if result_front and result_front.pose_landmarks:
-                    person_height_pixels = abs(left_heel[1] - nose[1])
+                height_pixels = _person_height_pixels()
+                if height_pixels is not None:
                     # Height = (pixel_height * real_distance) / focal_length
-                    calculated_height = (person_height_pixels * camera_distance) / focal_length
+                    calculated_height = (height_pixels * camera_distance) / focal_length
                     return calculated_height
     except:
         pass
     
     # Method 3: Using ArUco markers or checkerboard pattern
     try:
-        import cv2.aruco as aruco
-        img = cv2.imread(front_image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = get_image(front_image_path, cv2.IMREAD_GRAYSCALE)
         
         # Detect ArUco markers
-        aruco_dict = aruco.Dictionary_get(aruco.DICT_6X6_250)
-        parameters = aruco.DetectorParameters_create()
-        corners, ids, _ = aruco.detectMarkers(gray, aruco_dict, parameters=parameters)
+        corners, ids, _ = _aruco_detect()(gray)
         
         if ids is not None and len(ids) > 0:
-            # Known ArUco marker size (e.g., 10cm x 10cm)
-            ARUCO_SIZE_CM = 10
-            
             # Get marker height in pixels
             marker_corners = corners[0][0]
             marker_height_pixels = abs(marker_corners[0][1] - marker_corners[2][1])
@@ -107,10 +131,9 @@ def calculate_automatic_height(front_image_path, side_image_path):
             pixels_per_cm = marker_height_pixels / ARUCO_SIZE_CM
             
             # Get person's height in pixels
-            from medipie_cooordinates import result_front, nose, left_heel
-            if result_front and result_front.pose_landmarks:
-                person_height_pixels = abs(left_heel[1] - nose[1])
-                calculated_height = person_height_pixels / pixels_per_cm
+            height_pixels = _person_height_pixels()
+            if height_pixels is not None:
+                calculated_height = height_pixels / pixels_per_cm
                 return calculated_height
     except:
         pass
@@ -1,21 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
+from _image_cache import dump_image
+from _rembg_session import remove_background
 
-from rembg import remove
-import cv2
+# The worker runs every stage in one namespace, where the contrast stage has already defined its
+# images; runprogram imports each stage as its own module, so they are taken from that module
+if 'new_image' not in globals():
+    from decrease_contrast import new_image, new_image_side
 
-input_path = 'images/degrease_contrast.jpg'
-output_path = 'images/remove.jpg'
+# onnxruntime runs inference outside the GIL and a session may be shared between threads,
+# so the two photos are cut out in parallel
+with ThreadPoolExecutor(max_workers=2) as executor:
+    removed_image, removed_image_side = executor.map(remove_background, [new_image, new_image_side])
 
-input_main = cv2.imread(input_path)
-output = remove(input_main)
-cv2.imwrite(output_path, output)
+for output_path, output in [('images/remove.jpg', removed_image), ('images/remove_side.jpg', removed_image_side)]:
+    dump_image(output_path, output)
 
-print("removed background and saved the image to remove.jpg")
-
-input_path_side = 'images/degrease_contrast_side.jpg'
-output_path_side = 'images/remove_side.jpg'
-
-input_main_side = cv2.imread(input_path_side)
-output_side = remove(input_main_side)
-cv2.imwrite(output_path_side, output_side)
-
-print("removed background and saved the image to remove_side.jpg")
+    print(f"removed background and handed {output_path.split('/')[-1]} to silhouette generation")
@@ -36,13 +36,17 @@ else:
 import photos_height
 photos_height.height = height
 
-# Now import the rest of the modules
-from medipie_cooordinates import *
-from decrease_contrast import *
-from remove_backround import *
-from add_silhouette import *
-from body_segments import *
-from get_height import *
+# Now run the rest of the pipeline; each stage runs on import, in this order
+import medipie_cooordinates
+import decrease_contrast
+import remove_backround
+import add_silhouette
+import body_segments
+import get_height
+
+# Only these results are needed from the stages
+from medipie_cooordinates import landmarks_px, mp_pose
+from get_height import front_cm, side_cm, front_linear_cm, side_linear_cm, height_front
 
 # Import measurement validation and confidence modules
 from measurement_validator import MeasurementValidator
@@ -56,76 +60,91 @@ calc = MeasurementCalculator()
 # Enhanced measurement calculations
 print("\n--- Enhanced Measurements with Validation ---")
 
+# Enhanced measurement specification, in report order. Each group is only computed when every
+# listed result array is longer than the given minimum; each entry is (name, kind, arguments),
+# where (array name, index) arguments are looked up in the arrays from get_height
+MEASUREMENT_GROUPS = [
+    # Leg measurements with improved calculations
+    ({'front_cm': 5, 'side_cm': 3}, [
+        ('Left Calf Circumference', 'limb', (('front_cm', 0), ('side_cm', 0), 'calf')),
+        ('Right Calf Circumference', 'limb', (('front_cm', 4), ('side_cm', 2), 'calf')),
+        ('Left Thigh Circumference', 'limb', (('front_cm', 1), ('side_cm', 1), 'thigh')),
+        ('Right Thigh Circumference', 'limb', (('front_cm', 5), ('side_cm', 3), 'thigh')),
+    ]),
+    # Arm measurements
+    ({'front_cm': 7}, [
+        ('Left Lower Arm Circumference', 'diameter', (('front_cm', 3), 'forearm')),
+        ('Left Upper Arm Circumference', 'diameter', (('front_cm', 2), 'upper_arm')),
+        ('Right Lower Arm Circumference', 'diameter', (('front_cm', 7), 'forearm')),
+        ('Right Upper Arm Circumference', 'diameter', (('front_cm', 6), 'upper_arm')),
+        ('Right Arm Length', 'arm_length', (('front_cm', 6), ('front_cm', 7))),
+    ]),
+    # Torso measurements
+    ({'front_cm': 8, 'side_cm': 4}, [
+        ('Waist Circumference', 'torso', (('front_cm', 8), ('side_cm', 4), 'waist')),
+    ]),
+    ({'front_linear_cm': 1, 'side_linear_cm': 1}, [
+        ('Hip Circumference', 'torso', (('front_linear_cm', 1), ('side_linear_cm', 1), 'hip')),
+    ]),
+    ({'front_linear_cm': 0}, [
+        ('Shoulder Breadth', 'linear', (('front_linear_cm', 0),)),  # Direct linear measurement
+    ]),
+    # Additional measurements
+    ({'front_cm': 15, 'side_cm': 7}, [
+        ('Head Circumference', 'ellipse', (('front_cm', 15), ('side_cm', 7))),
+        ('Neck Circumference', 'torso', (('front_cm', 9), ('side_cm', 5), 'neck')),
+        ('Chest Circumference', 'torso', (('front_cm', 10), ('side_cm', 6), 'chest')),
+        ('Right Wrist Circumference', 'diameter', (('front_cm', 11), 'wrist')),
+        ('Right Bicep Circumference', 'diameter', (('front_cm', 12), 'bicep')),
+        ('Right Forearm Circumference', 'diameter', (('front_cm', 13), 'forearm')),
+        ('Left Ankle Circumference', 'diameter', (('front_cm', 14), 'ankle')),
+    ]),
+    # Linear measurements
+    ({'front_linear_cm': 2}, [('Shoulder to Crotch Height', 'linear', (('front_linear_cm', 2),))]),
+    ({'front_linear_cm': 3}, [('Right Foot Length', 'linear', (('front_linear_cm', 3),))]),
+    ({'front_linear_cm': 4}, [('Right Foot Width', 'linear', (('front_linear_cm', 4),))]),
+    ({'side_linear_cm': 2}, [('Back to Shoulder', 'linear', (('side_linear_cm', 2),))]),
+]
+
+MEASUREMENT_KINDS = {
+    'torso': calc.calculate_torso_circumference,
+    'diameter': calc.calculate_circumference_from_diameter,
+    'ellipse': calc.calculate_circumference_from_ellipse,
+    'linear': lambda value: value,
+    'arm_length': lambda upper, lower: (upper + lower) * 0.8,  # Adjusted multiplier for realistic length
+}
+
+measurement_arrays = {
+    'front_cm': front_cm,
+    'side_cm': side_cm,
+    'front_linear_cm': front_linear_cm,
+    'side_linear_cm': side_linear_cm,
+}
+
 # Create enhanced measurements dictionary
 enhanced_measurements = {}
 
-# Leg measurements with improved calculations
-if len(front_cm) > 5 and len(side_cm) > 3:
-    enhanced_measurements['Left Calf Circumference'] = calc.calculate_limb_circumference(
-        front_cm[0], side_cm[0] if len(side_cm) > 0 else front_cm[0], 'calf')
-    enhanced_measurements['Right Calf Circumference'] = calc.calculate_limb_circumference(
-        front_cm[4], side_cm[2] if len(side_cm) > 2 else front_cm[4], 'calf')
-    enhanced_measurements['Left Thigh Circumference'] = calc.calculate_limb_circumference(
-        front_cm[1], side_cm[1] if len(side_cm) > 1 else front_cm[1], 'thigh')
-    enhanced_measurements['Right Thigh Circumference'] = calc.calculate_limb_circumference(
-        front_cm[5], side_cm[3] if len(side_cm) > 3 else front_cm[5], 'thigh')
-
-# Arm measurements
-if len(front_cm) > 7:
-    enhanced_measurements['Left Lower Arm Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[3], 'forearm')
-    enhanced_measurements['Left Upper Arm Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[2], 'upper_arm')
-    enhanced_measurements['Right Lower Arm Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[7], 'forearm')
-    enhanced_measurements['Right Upper Arm Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[6], 'upper_arm')
-    
-    # Improved arm length calculation
-    arm_length = (front_cm[6] + front_cm[7]) * 0.8  # Adjusted multiplier for realistic length
-    enhanced_measurements['Right Arm Length'] = arm_length
-
-# Torso measurements
-if len(front_cm) > 8 and len(side_cm) > 4:
-    enhanced_measurements['Waist Circumference'] = calc.calculate_torso_circumference(
-        front_cm[8], side_cm[4] if len(side_cm) > 4 else front_cm[8], 'waist')
-
-if len(front_linear_cm) > 1 and len(side_linear_cm) > 1:
-    enhanced_measurements['Hip Circumference'] = calc.calculate_torso_circumference(
-        front_linear_cm[1], side_linear_cm[1] if len(side_linear_cm) > 1 else front_linear_cm[1], 'hip')
-
-if len(front_linear_cm) > 0:
-    enhanced_measurements['Shoulder Breadth'] = front_linear_cm[0]  # Direct linear measurement
-
-# Additional measurements
-if len(front_cm) > 15 and len(side_cm) > 7:
-    enhanced_measurements['Head Circumference'] = calc.calculate_circumference_from_ellipse(
-        front_cm[15], side_cm[7])
-    enhanced_measurements['Neck Circumference'] = calc.calculate_torso_circumference(
-        front_cm[9], side_cm[5], 'neck')
-    enhanced_measurements['Chest Circumference'] = calc.calculate_torso_circumference(
-        front_cm[10], side_cm[6], 'chest')
-    enhanced_measurements['Right Wrist Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[11], 'wrist')
-    enhanced_measurements['Right Bicep Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[12], 'bicep')
-    enhanced_measurements['Right Forearm Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[13], 'forearm')
-    enhanced_measurements['Left Ankle Circumference'] = calc.calculate_circumference_from_diameter(
-        front_cm[14], 'ankle')
-
-# Linear measurements
-if len(front_linear_cm) > 2:
-    enhanced_measurements['Shoulder to Crotch Height'] = front_linear_cm[2]
-if len(front_linear_cm) > 3:
-    enhanced_measurements['Right Foot Length'] = front_linear_cm[3]
-if len(front_linear_cm) > 4:
-    enhanced_measurements['Right Foot Width'] = front_linear_cm[4]
-if len(side_linear_cm) > 2:
-    enhanced_measurements['Back to Shoulder'] = side_linear_cm[2]
+# Resolve the arguments of every measurement whose group applies
+enabled_measurements = [
+    (name, kind, [measurement_arrays[arg[0]][arg[1]] if isinstance(arg, tuple) else arg for arg in args])
+    for required_lengths, entries in MEASUREMENT_GROUPS
+    if all(len(measurement_arrays[array]) > length for array, length in required_lengths.items())
+    for name, kind, args in entries
+]
+
+# All limb circumferences are computed in one vectorized call
+limb_values = [values for _, kind, values in enabled_measurements if kind == 'limb']
+limb_circumferences = iter(calc.calculate_limb_circumferences_batch(*zip(*limb_values)) if limb_values else ())
+
+for name, kind, values in enabled_measurements:
+    if kind == 'limb':
+        enhanced_measurements[name] = next(limb_circumferences)
+    else:
+        enhanced_measurements[name] = MEASUREMENT_KINDS[kind](*values)
 
 # Calculate inside leg height (inseam)
-inside_leg_height = (abs(left_heel[1] - left_hip[1]) * height) / height_front
+LEFT_HIP, LEFT_HEEL = mp_pose.PoseLandmark.LEFT_HIP, mp_pose.PoseLandmark.LEFT_HEEL
+inside_leg_height = (abs(landmarks_px[LEFT_HEEL, 1] - landmarks_px[LEFT_HIP, 1]) * height) / height_front
 enhanced_measurements['Inside Leg Height'] = inside_leg_height
 
 # Add height to measurements
@@ -140,10 +159,10 @@ print("\n--- Measurement Confidence Analysis ---")
 confidence_analyzer = MeasurementConfidence(height)
 confidence_scores = confidence_analyzer.calculate_confidence_score(corrected_measurements)
 
-print("\n--- Measurement Confidence Scores ---")
-for measurement, score in confidence_scores.items():
-    status = "✓" if score >= 80 else "⚠" if score >= 60 else "✗"
-    print(f"{status} {measurement}: {score:.1f}%")
+# Build the whole score table and print it in one write
+score_lines = [f"{'✓' if score >= 80 else '⚠' if score >= 60 else '✗'} {measurement}: {score:.1f}%"
+               for measurement, score in confidence_scores.items()]
+print("\n".join(["\n--- Measurement Confidence Scores ---"] + score_lines))
 
 overall_confidence = confidence_analyzer.get_overall_confidence(confidence_scores)
 print(f"\nOverall Measurement Confidence: {overall_confidence:.1f}%")
@@ -204,14 +223,11 @@ with open('measurements_report.json', 'w') as f:
 import csv
 
 csv_filename = f"measurements_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-with open(csv_filename, 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['Measurement', 'Value (cm)', 'Confidence (%)'])
-    for key, value in corrected_measurements.items():
-        if isinstance(value, (int, float)):
-            confidence = confidence_scores.get(key, 'N/A')
-            if isinstance(confidence, float):
-                writer.writerow([key, f"{value:.2f}", f"{confidence:.1f}"])
-            else:
-                writer.writerow([key, f"{value:.2f}", confidence])
+csv_rows = [['Measurement', 'Value (cm)', 'Confidence (%)']]
+for key, value in corrected_measurements.items():
+    if isinstance(value, (int, float)):
+        confidence = confidence_scores.get(key, 'N/A')
+        csv_rows.append([key, f"{value:.2f}", f"{confidence:.1f}" if isinstance(confidence, float) else confidence])
+with open(csv_filename, 'w', newline='', buffering=1 << 20) as csvfile:
+    csv.writer(csvfile).writerows(csv_rows)
     print(f"CSV report saved to '{csv_filename}'")
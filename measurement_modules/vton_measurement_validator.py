@@ -2,18 +2,55 @@
 
 import math
 import json
+import logging
 import cv2
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 
+logger = logging.getLogger(__name__)
+
+# Measurement type of a key, by first matching rule; a rule matches when every substring
+# of any one of its alternatives occurs in the lower-cased key
+MEASUREMENT_TYPE_RULES = (
+    ('wrist_circumference', (('wrist',),)),
+    ('forearm_circumference', (('forearm',),)),
+    ('bicep_circumference', (('bicep',), ('upper_arm',))),
+    ('chest_circumference', (('chest',), ('bust',))),
+    ('waist_circumference', (('waist',),)),
+    ('hip_circumference', (('hip',),)),
+    ('thigh_circumference', (('thigh',),)),
+    ('calf_circumference', (('calf',),)),
+    ('neck_circumference', (('neck',),)),
+    ('shoulder_breadth', (('shoulder',),)),
+    ('height', (('height',),)),
+    ('arm_length', (('arm', 'length'),)),
+    ('leg_length', (('leg', 'length'), ('leg', 'inseam'))),
+)
+
+
+@lru_cache(maxsize=512)
+def _measurement_type(key: str) -> str:
+    # The same few key names are classified over and over, so each is matched only once
+    key_lower = key.lower()
+    for measurement_type, alternatives in MEASUREMENT_TYPE_RULES:
+        if any(all(part in key_lower for part in alternative) for alternative in alternatives):
+            return measurement_type
+    return key_lower
+
+
 class VTONMeasurementValidator:
     """
     Professional body measurement validator for Virtual Try-On (VTON) applications.
     Fixes critical issues: oversized measurements, scaling errors, validation problems.
+    Validation keeps no per-call state on the instance, so one validator is thread-safe.
     """
     
-    def __init__(self):
+    def __init__(self, verbose: bool = True):
+        # Per-correction notes in the output are only assembled when verbose
+        self.verbose = verbose
+        
         # Human body measurement ranges (in cm)
         self.human_ranges = {
             'wrist_circumference': (13, 22),
@@ -61,9 +98,20 @@ class VTONMeasurementValidator:
             'XXL': {'chest': (111, 116), 'waist': (96, 101), 'hip': (111, 116)}
         }
         
-        self.validation_notes = []
-        self.corrections_applied = 0
-        
+        # Range and height-ratio bounds as arrays indexed by measurement type; the trailing
+        # NaN row is what types without bounds map to, and NaN never compares out of range
+        self._range_index = {t: i for i, t in enumerate(self.human_ranges)}
+        self._range_bounds = np.array(list(self.human_ranges.values()) + [(np.nan, np.nan)], dtype=np.float64)
+        self._ratio_index = {t: i for i, t in enumerate(self.height_ratios)}
+        self._ratio_bounds = np.array(list(self.height_ratios.values()) + [(np.nan, np.nan)], dtype=np.float64)
+        
+        # Size charts as (sizes, [chest, waist, hip]) min/max arrays for the vectorized size match
+        self._size_charts = {
+            gender: (list(chart), np.array([[ranges[part] for part in ('chest', 'waist', 'hip')]
+                                            for ranges in chart.values()], dtype=np.float64))
+            for gender, chart in (('female', self.female_sizes), ('male', self.male_sizes))
+        }
+    
     def validate_and_correct_measurements(self, raw_measurements: Dict, 
                                         front_height_px: Optional[int] = None,
                                         side_height_px: Optional[int] = None,
@@ -80,223 +128,248 @@ class VTONMeasurementValidator:
         Returns:
             Dict with corrected measurements and validation metadata
         """
-        self.validation_notes = []
-        self.corrections_applied = 0
+        # All per-call state (notes, correction count) is local and returned by each step,
+        # so one validator can serve concurrent requests
+        logger.debug("[VTON VALIDATOR] Starting professional measurement validation...")
+        logger.debug("[VTON VALIDATOR] Raw measurements received: %d items", len(raw_measurements))
         
-        print(f"\n[VTON VALIDATOR] Starting professional measurement validation...")
-        print(f"[VTON VALIDATOR] Raw measurements received: {len(raw_measurements)} items")
+        # Classify every key once for the whole pass; every later step keeps the filtered keys,
+        # so the first key of each type is fixed here too
+        key_to_type = {key: self._identify_measurement_type(key) for key in raw_measurements}
         
         # Step 1: Pre-validation filter - detect impossible measurements
-        filtered_measurements = self._pre_validation_filter(raw_measurements)
+        filtered_measurements, filter_notes = self._pre_validation_filter(raw_measurements, key_to_type)
+        type_to_key = {}
+        for key in filtered_measurements:
+            type_to_key.setdefault(key_to_type[key], key)
         
         # Step 2: Unify front-side scaling
-        unified_scale_factor = self._calculate_unified_scale_factor(
+        unified_scale_factor, scale_notes = self._calculate_unified_scale_factor(
             front_height_px, side_height_px, detected_height_cm
         )
         
         # Step 3: Apply unified scaling to pixel measurements
-        scaled_measurements = self._apply_unified_scaling(filtered_measurements, unified_scale_factor)
+        scaled_measurements, scaling_notes = self._apply_unified_scaling(filtered_measurements, unified_scale_factor)
         
         # Step 4: Proportional validation and correction
-        corrected_measurements = self._apply_proportional_correction(scaled_measurements, detected_height_cm)
+        corrected_measurements, correction_notes, corrections_applied = self._apply_proportional_correction(
+            scaled_measurements, detected_height_cm, key_to_type, type_to_key
+        )
+        validation_notes = filter_notes + scale_notes + scaling_notes + correction_notes
         
         # Step 5: Gender detection and clothing size classification
-        gender = self._detect_gender(corrected_measurements)
-        clothing_size = self._classify_clothing_size(corrected_measurements, gender)
+        gender = self._detect_gender(corrected_measurements, type_to_key)
+        clothing_size = self._classify_clothing_size(corrected_measurements, gender, type_to_key)
         
         # Step 6: Calculate confidence score
-        confidence_score = self._calculate_confidence_score(corrected_measurements, raw_measurements)
+        confidence_score = self._calculate_confidence_score(
+            corrected_measurements, raw_measurements, key_to_type, corrections_applied
+        )
         
         # Step 7: Format final output
         return self._format_final_output(
-            corrected_measurements, clothing_size, confidence_score, gender
+            corrected_measurements, clothing_size, confidence_score, gender, key_to_type,
+            validation_notes, corrections_applied
         )
     
-    def _pre_validation_filter(self, raw_measurements: Dict) -> Dict:
-        """Step 1: Detect and filter impossible measurements"""
-        print(f"[VTON VALIDATOR] Step 1: Pre-validation filter")
+    def _pre_validation_filter(self, raw_measurements: Dict,
+                               key_to_type: Dict[str, str]) -> Tuple[Dict, List[str]]:
+        """Step 1: Detect and filter impossible measurements; returns (filtered, notes)"""
+        logger.debug("[VTON VALIDATOR] Step 1: Pre-validation filter")
+        
+        items = [(key, value) for key, value in raw_measurements.items()
+                 if isinstance(value, (int, float)) and not value <= 0]
+        measurement_types = [key_to_type[key] for key, _ in items]
+        
+        # Check every measurement against its human range at once
+        values = np.array([value for _, value in items], dtype=np.float64)
+        bounds = self._range_bounds[[self._range_index.get(t, -1) for t in measurement_types]]
+        impossible = (values < bounds[:, 0]) | (values > bounds[:, 1])
         
         filtered = {}
-        impossible_count = 0
-        
-        for key, value in raw_measurements.items():
-            if not isinstance(value, (int, float)) or value <= 0:
-                continue
-                
-            # Check if measurement is within human ranges
-            measurement_type = self._identify_measurement_type(key)
-            
-            if measurement_type in self.human_ranges:
-                min_val, max_val = self.human_ranges[measurement_type]
-                
-                if value < min_val or value > max_val:
-                    impossible_count += 1
-                    self.validation_notes.append(
+        notes = []
+        for (key, value), measurement_type, is_impossible in zip(items, measurement_types, impossible):
+            if is_impossible:
+                if self.verbose:
+                    min_val, max_val = self.human_ranges[measurement_type]
+                    notes.append(
                         f"Filtered impossible {measurement_type}: {value:.1f}cm (human range: {min_val}-{max_val}cm)"
                     )
-                    # Mark for recalculation instead of including
-                    filtered[key] = None
-                else:
-                    filtered[key] = value
+                # Mark for recalculation instead of including
+                filtered[key] = None
             else:
-                # Unknown measurement type, keep as-is
+                # In range, or unknown measurement type kept as-is
                 filtered[key] = value
         
-        print(f"[VTON VALIDATOR] Filtered {impossible_count} impossible measurements")
-        return filtered
+        logger.debug("[VTON VALIDATOR] Filtered %d impossible measurements", np.count_nonzero(impossible))
+        return filtered, notes
     
     def _calculate_unified_scale_factor(self, front_height_px: Optional[int], 
                                       side_height_px: Optional[int], 
-                                      detected_height_cm: Optional[float]) -> float:
-        """Step 2: Calculate unified pixel-to-cm conversion factor"""
-        print(f"[VTON VALIDATOR] Step 2: Calculating unified scale factor")
+                                      detected_height_cm: Optional[float]) -> Tuple[float, List[str]]:
+        """Step 2: Calculate unified pixel-to-cm conversion factor; returns (factor, notes)"""
+        logger.debug("[VTON VALIDATOR] Step 2: Calculating unified scale factor")
         
         if not detected_height_cm:
             detected_height_cm = 170.0  # Default fallback
         
         scale_factors = []
+        notes = []
         
         if front_height_px and front_height_px > 0:
             front_scale = detected_height_cm / front_height_px
             scale_factors.append(front_scale)
-            print(f"[VTON VALIDATOR] Front scale factor: {front_scale:.6f} cm/px")
+            logger.debug("[VTON VALIDATOR] Front scale factor: %.6f cm/px", front_scale)
         
         if side_height_px and side_height_px > 0:
             side_scale = detected_height_cm / side_height_px
             scale_factors.append(side_scale)
-            print(f"[VTON VALIDATOR] Side scale factor: {side_scale:.6f} cm/px")
+            logger.debug("[VTON VALIDATOR] Side scale factor: %.6f cm/px", side_scale)
         
         if scale_factors:
             # Use mean of available scale factors
             unified_scale = sum(scale_factors) / len(scale_factors)
-            print(f"[VTON VALIDATOR] Unified scale factor: {unified_scale:.6f} cm/px")
+            logger.debug("[VTON VALIDATOR] Unified scale factor: %.6f cm/px", unified_scale)
             
             # Check for large discrepancy between front and side
             if len(scale_factors) == 2:
                 discrepancy = abs(scale_factors[0] - scale_factors[1]) / unified_scale * 100
                 if discrepancy > 20:  # More than 20% difference
-                    self.validation_notes.append(
-                        f"Large front-side scaling discrepancy: {discrepancy:.1f}%"
-                    )
+                    if self.verbose:
+                        notes.append(
+                            f"Large front-side scaling discrepancy: {discrepancy:.1f}%"
+                        )
             
-            return unified_scale
+            return unified_scale, notes
         else:
             # Fallback: assume reasonable pixel height
             fallback_scale = detected_height_cm / 1000  # Assume 1000px height
-            print(f"[VTON VALIDATOR] Using fallback scale factor: {fallback_scale:.6f} cm/px")
-            return fallback_scale
+            logger.debug("[VTON VALIDATOR] Using fallback scale factor: %.6f cm/px", fallback_scale)
+            return fallback_scale, notes
     
-    def _apply_unified_scaling(self, measurements: Dict, scale_factor: float) -> Dict:
-        """Step 3: Apply unified scaling to convert pixels to centimeters"""
-        print(f"[VTON VALIDATOR] Step 3: Applying unified scaling")
+    def _apply_unified_scaling(self, measurements: Dict, scale_factor: float) -> Tuple[Dict, List[str]]:
+        """Step 3: Apply unified scaling to convert pixels to centimeters; returns (scaled, notes)"""
+        logger.debug("[VTON VALIDATOR] Step 3: Applying unified scaling")
         
-        scaled = {}
-        pixel_conversions = 0
+        # Values above 100 are likely pixel measurements (no body measurement here is that large
+        # in cm); flag and convert them all at once. Missing values are NaN and never flagged
+        values = np.array([np.nan if value is None else value for value in measurements.values()], dtype=np.float64)
+        is_pixel = values > 100
+        converted = (values * scale_factor).tolist()
+        pixel_conversions = int(np.count_nonzero(is_pixel))
         
-        for key, value in measurements.items():
-            if value is None:
-                scaled[key] = None
-                continue
-                
-            # Detect if value is likely in pixels (> 100 for most body measurements)
-            if value > 100:
-                # Likely pixel measurement, convert to cm
-                scaled_value = value * scale_factor
+        scaled = {}
+        notes = []
+        for (key, value), pixel, scaled_value in zip(measurements.items(), is_pixel, converted):
+            if pixel:
                 scaled[key] = scaled_value
-                pixel_conversions += 1
-                
-                self.validation_notes.append(
-                    f"Converted {key}: {value:.0f}px → {scaled_value:.1f}cm"
-                )
+                if self.verbose:
+                    notes.append(
+                        f"Converted {key}: {value:.0f}px → {scaled_value:.1f}cm"
+                    )
             else:
-                # Already in cm or reasonable range
+                # Missing, or already in cm
                 scaled[key] = value
         
-        print(f"[VTON VALIDATOR] Converted {pixel_conversions} pixel measurements to cm")
-        return scaled
+        logger.debug("[VTON VALIDATOR] Converted %d pixel measurements to cm", pixel_conversions)
+        return scaled, notes
     
-    def _apply_proportional_correction(self, measurements: Dict, height_cm: float) -> Dict:
-        """Step 4: Apply proportional validation and correction"""
-        print(f"[VTON VALIDATOR] Step 4: Applying proportional correction")
+    def _apply_proportional_correction(self, measurements: Dict, height_cm: float,
+                                       key_to_type: Dict[str, str],
+                                       type_to_key: Dict[str, str]) -> Tuple[Dict, List[str], int]:
+        """Step 4: Apply proportional validation and correction; returns (corrected, notes, corrections)"""
+        logger.debug("[VTON VALIDATOR] Step 4: Applying proportional correction")
         
         if not height_cm or height_cm < 140 or height_cm > 200:
             height_cm = 170.0  # Safe default
         
+        measurement_types = [key_to_type[key] for key in measurements]
+        
+        # Validate every measurement against its height ratio at once; missing values are NaN
+        # and types without a ratio get NaN bounds, so neither is flagged
+        values = np.array([np.nan if value is None else value for value in measurements.values()], dtype=np.float64)
+        bounds = self._ratio_bounds[[self._ratio_index.get(t, -1) for t in measurement_types]] * height_cm
+        out_of_range = (values < bounds[:, 0]) | (values > bounds[:, 1])
+        # Clamp to valid range with ±10% tolerance
+        tolerance = 0.10
+        clamped = np.maximum(bounds[:, 0] * (1 - tolerance), np.minimum(values, bounds[:, 1] * (1 + tolerance))).tolist()
+        
         corrected = {}
+        notes = []
+        corrections = 0
         
-        for key, value in measurements.items():
-            measurement_type = self._identify_measurement_type(key)
-            
+        for (key, value), measurement_type, is_out, clamped_value in zip(
+                measurements.items(), measurement_types, out_of_range, clamped):
             if value is None:
                 # Recalculate from proportional ratios
                 corrected[key] = self._estimate_from_height_ratio(measurement_type, height_cm)
-                self.corrections_applied += 1
-                self.validation_notes.append(
-                    f"Estimated {measurement_type}: {corrected[key]:.1f}cm from height ratio"
-                )
-            elif measurement_type in self.height_ratios:
-                # Validate against height ratios
-                min_ratio, max_ratio = self.height_ratios[measurement_type]
-                min_val = height_cm * min_ratio
-                max_val = height_cm * max_ratio
-                
-                if value < min_val or value > max_val:
-                    # Clamp to valid range with ±10% tolerance
-                    tolerance = 0.10
-                    clamped_value = max(min_val * (1 - tolerance), 
-                                      min(value, max_val * (1 + tolerance)))
-                    
-                    corrected[key] = clamped_value
-                    self.corrections_applied += 1
-                    self.validation_notes.append(
+                corrections += 1
+                if self.verbose:
+                    notes.append(
+                        f"Estimated {measurement_type}: {corrected[key]:.1f}cm from height ratio"
+                    )
+            elif is_out:
+                # Keep the original object when the tolerance band already covers it
+                clamped_value = value if clamped_value == value else clamped_value
+                corrected[key] = clamped_value
+                corrections += 1
+                if self.verbose:
+                    notes.append(
                         f"Corrected {measurement_type}: {value:.1f}cm → {clamped_value:.1f}cm (proportional to height)"
                     )
-                else:
-                    corrected[key] = value
             else:
-                # No specific ratio, keep as-is
+                # Within ratio, or no specific ratio: keep as-is
                 corrected[key] = value
         
         # Apply inter-measurement relationships
-        corrected = self._apply_inter_measurement_validation(corrected)
+        corrected, relation_notes, relation_corrections = self._apply_inter_measurement_validation(
+            corrected, type_to_key
+        )
+        notes += relation_notes
+        corrections += relation_corrections
         
-        print(f"[VTON VALIDATOR] Applied {self.corrections_applied} proportional corrections")
-        return corrected
+        logger.debug("[VTON VALIDATOR] Applied %d proportional corrections", corrections)
+        return corrected, notes, corrections
     
-    def _apply_inter_measurement_validation(self, measurements: Dict) -> Dict:
-        """Apply relationships between measurements (waist < chest < hips, etc.)"""
+    def _apply_inter_measurement_validation(self, measurements: Dict,
+                                            type_to_key: Dict[str, str]) -> Tuple[Dict, List[str], int]:
+        """Apply relationships between measurements (waist < chest < hips, etc.); returns (corrected, notes, corrections)"""
         corrected = measurements.copy()
+        notes = []
+        corrections = 0
         
         # Extract key measurements
-        chest = self._get_measurement_value(corrected, 'chest_circumference')
-        waist = self._get_measurement_value(corrected, 'waist_circumference') 
-        hips = self._get_measurement_value(corrected, 'hip_circumference')
+        chest = self._get_measurement_value(corrected, 'chest_circumference', type_to_key)
+        waist = self._get_measurement_value(corrected, 'waist_circumference', type_to_key)
+        hips = self._get_measurement_value(corrected, 'hip_circumference', type_to_key)
         
         if chest and waist and hips:
             # Ensure waist < chest and waist < hips
             if waist >= chest:
                 corrected_waist = chest * 0.85  # 85% of chest
-                self._update_measurement(corrected, 'waist_circumference', corrected_waist)
-                self.validation_notes.append(
-                    f"Corrected waist to be < chest: {waist:.1f}cm → {corrected_waist:.1f}cm"
-                )
+                self._update_measurement(corrected, 'waist_circumference', corrected_waist, type_to_key)
+                if self.verbose:
+                    notes.append(
+                        f"Corrected waist to be < chest: {waist:.1f}cm → {corrected_waist:.1f}cm"
+                    )
                 waist = corrected_waist
-                self.corrections_applied += 1
+                corrections += 1
             
             if waist >= hips:
                 corrected_waist = hips * 0.90  # 90% of hips
-                self._update_measurement(corrected, 'waist_circumference', corrected_waist)
-                self.validation_notes.append(
-                    f"Corrected waist to be < hips: {waist:.1f}cm → {corrected_waist:.1f}cm"
-                )
-                self.corrections_applied += 1
+                self._update_measurement(corrected, 'waist_circumference', corrected_waist, type_to_key)
+                if self.verbose:
+                    notes.append(
+                        f"Corrected waist to be < hips: {waist:.1f}cm → {corrected_waist:.1f}cm"
+                    )
+                corrections += 1
         
-        return corrected
+        return corrected, notes, corrections
     
-    def _detect_gender(self, measurements: Dict) -> str:
+    def _detect_gender(self, measurements: Dict, type_to_key: Dict[str, str]) -> str:
         """Detect gender from measurement patterns"""
-        waist = self._get_measurement_value(measurements, 'waist_circumference')
-        hips = self._get_measurement_value(measurements, 'hip_circumference')
+        waist = self._get_measurement_value(measurements, 'waist_circumference', type_to_key)
+        hips = self._get_measurement_value(measurements, 'hip_circumference', type_to_key)
         
         if waist and hips:
             whr = waist / hips
@@ -305,38 +378,31 @@ class VTONMeasurementValidator:
         
         return 'female'  # Default assumption for clothing sizing
     
-    def _classify_clothing_size(self, measurements: Dict, gender: str) -> str:
+    def _classify_clothing_size(self, measurements: Dict, gender: str, type_to_key: Dict[str, str]) -> str:
         """Classify clothing size using distance-based matching"""
-        chest = self._get_measurement_value(measurements, 'chest_circumference')
-        waist = self._get_measurement_value(measurements, 'waist_circumference')
-        hips = self._get_measurement_value(measurements, 'hip_circumference')
+        chest = self._get_measurement_value(measurements, 'chest_circumference', type_to_key)
+        waist = self._get_measurement_value(measurements, 'waist_circumference', type_to_key)
+        hips = self._get_measurement_value(measurements, 'hip_circumference', type_to_key)
         
         if not (chest and waist and hips):
             return 'Unknown'
         
-        size_chart = self.female_sizes if gender == 'female' else self.male_sizes
+        sizes, bounds = self._size_charts['female' if gender == 'female' else 'male']
         
-        best_size = 'M'
-        min_distance = float('inf')
+        # Distance of each measurement to each size's range, for all sizes at once
+        values = np.array([chest, waist, hips], dtype=np.float64)
+        distances = np.maximum(0, bounds[:, :, 0] - values) + np.maximum(0, values - bounds[:, :, 1])
         
-        for size, ranges in size_chart.items():
-            # Calculate weighted distance
-            chest_dist = self._calculate_range_distance(chest, ranges['chest'])
-            waist_dist = self._calculate_range_distance(waist, ranges['waist'])
-            hip_dist = self._calculate_range_distance(hips, ranges['hip'])
-            
-            # Weighted: chest=40%, waist=35%, hips=25%
-            total_distance = (chest_dist * 0.4) + (waist_dist * 0.35) + (hip_dist * 0.25)
-            
-            if total_distance < min_distance:
-                min_distance = total_distance
-                best_size = size
+        # Weighted: chest=40%, waist=35%, hips=25%
+        total_distance = (distances[:, 0] * 0.4) + (distances[:, 1] * 0.35) + (distances[:, 2] * 0.25)
+        best = int(np.argmin(total_distance))
         
         # Return Unknown if no reasonable fit (distance > 10cm average)
-        return best_size if min_distance < 10 else 'Unknown'
+        return sizes[best] if total_distance[best] < 10 else 'Unknown'
     
     def _calculate_confidence_score(self, corrected_measurements: Dict, 
-                                  raw_measurements: Dict) -> float:
+                                  raw_measurements: Dict, key_to_type: Dict[str, str],
+                                  corrections_applied: int) -> float:
         """Calculate confidence score based on validation quality"""
         total_measurements = len([v for v in corrected_measurements.values() if v is not None])
         
@@ -347,14 +413,14 @@ class VTONMeasurementValidator:
         confidence = 100.0
         
         # Reduce for corrections applied
-        correction_penalty = min(self.corrections_applied * 5, 30)  # Max 30% penalty
+        correction_penalty = min(corrections_applied * 5, 30)  # Max 30% penalty
         confidence -= correction_penalty
         
         # Reduce for measurements within valid ranges
         valid_measurements = 0
         for key, value in corrected_measurements.items():
             if value is not None:
-                measurement_type = self._identify_measurement_type(key)
+                measurement_type = key_to_type[key]
                 if measurement_type in self.human_ranges:
                     min_val, max_val = self.human_ranges[measurement_type]
                     if min_val <= value <= max_val:
@@ -366,23 +432,23 @@ class VTONMeasurementValidator:
         return max(60.0, min(100.0, confidence))
     
     def _format_final_output(self, measurements: Dict, clothing_size: str, 
-                           confidence_score: float, gender: str) -> Dict:
+                           confidence_score: float, gender: str, key_to_type: Dict[str, str],
+                           validation_notes: List[str], corrections_applied: int) -> Dict:
         """Format the final output with all required information"""
         
         # Create final measurements table (only corrected values)
         final_measurements = {}
         for key, value in measurements.items():
             if value is not None:
-                measurement_type = self._identify_measurement_type(key)
-                final_measurements[measurement_type] = round(value, 1)
+                final_measurements[key_to_type[key]] = round(value, 1)
         
         return {
             "final_measurements": final_measurements,
             "clothing_size": clothing_size,
             "confidence_score": round(confidence_score, 1),
             "gender_detected": gender,
-            "validation_notes": self.validation_notes,
-            "corrections_applied": self.corrections_applied,
+            "validation_notes": validation_notes,
+            "corrections_applied": corrections_applied,
             "processed_at": datetime.now().isoformat(),
             "validation_method": "vton_professional"
         }
@@ -390,36 +456,7 @@ class VTONMeasurementValidator:
     # Helper methods
     def _identify_measurement_type(self, key: str) -> str:
         """Identify measurement type from key name"""
-        key_lower = key.lower()
-        
-        if 'wrist' in key_lower:
-            return 'wrist_circumference'
-        elif 'forearm' in key_lower:
-            return 'forearm_circumference'
-        elif 'bicep' in key_lower or 'upper_arm' in key_lower:
-            return 'bicep_circumference'
-        elif 'chest' in key_lower or 'bust' in key_lower:
-            return 'chest_circumference'
-        elif 'waist' in key_lower:
-            return 'waist_circumference'
-        elif 'hip' in key_lower:
-            return 'hip_circumference'
-        elif 'thigh' in key_lower:
-            return 'thigh_circumference'
-        elif 'calf' in key_lower:
-            return 'calf_circumference'
-        elif 'neck' in key_lower:
-            return 'neck_circumference'
-        elif 'shoulder' in key_lower:
-            return 'shoulder_breadth'
-        elif 'height' in key_lower:
-            return 'height'
-        elif 'arm' in key_lower and 'length' in key_lower:
-            return 'arm_length'
-        elif 'leg' in key_lower and ('length' in key_lower or 'inseam' in key_lower):
-            return 'leg_length'
-        else:
-            return key.lower()
+        return _measurement_type(key)
     
     def _estimate_from_height_ratio(self, measurement_type: str, height_cm: float) -> float:
         """Estimate measurement from height using anthropometric ratios"""
@@ -440,31 +477,19 @@ class VTONMeasurementValidator:
         
         return estimates.get(measurement_type, height_cm * 0.2)
     
-    def _get_measurement_value(self, measurements: Dict, measurement_type: str) -> Optional[float]:
+    def _get_measurement_value(self, measurements: Dict, measurement_type: str,
+                               type_to_key: Dict[str, str]) -> Optional[float]:
         """Get measurement value by type"""
-        for key, value in measurements.items():
-            if self._identify_measurement_type(key) == measurement_type:
-                return value
-        return None
+        return measurements.get(type_to_key.get(measurement_type))
     
-    def _update_measurement(self, measurements: Dict, measurement_type: str, new_value: float):
+    def _update_measurement(self, measurements: Dict, measurement_type: str, new_value: float,
+                            type_to_key: Dict[str, str]):
         """Update measurement value by type"""
-        for key in measurements.keys():
-            if self._identify_measurement_type(key) == measurement_type:
-                measurements[key] = new_value
-                break
-    
-    def _calculate_range_distance(self, value: float, range_tuple: Tuple[float, float]) -> float:
-        """Calculate distance from value to range"""
-        min_val, max_val = range_tuple
-        if min_val <= value <= max_val:
-            return 0.0
-        elif value < min_val:
-            return min_val - value
-        else:
-            return value - max_val
+        key = type_to_key.get(measurement_type)
+        if key in measurements:
+            measurements[key] = new_value
 
-# Global validator instance
+# Global validator instance; it only holds read-only charts, so concurrent calls can share it
 vton_validator = VTONMeasurementValidator()
 
 def validate_vton_measurements(raw_measurements: Dict, 
@@ -1,6 +1,75 @@
 from datetime import datetime
 from firebase_config import db, firebase_initialized
+import atexit
+import threading
+import time
 import uuid
+from functools import lru_cache
+
+def _isoformat(timestamp):
+    """ISO string of a time.time() stamp; stamps read back from Firestore are already strings"""
+    if isinstance(timestamp, float):
+        return datetime.fromtimestamp(timestamp).isoformat()
+    return timestamp
+
+@lru_cache(maxsize=1024)
+def _jobs_collection(user_id):
+    """A user's scraping_jobs collection reference, built once per user"""
+    return db.collection('users').document(user_id).collection('scraping_jobs')
+
+class _JobWriteBuffer:
+    """Collects job document writes and commits them together as one Firestore batch"""
+    
+    FLUSH_INTERVAL = 0.2  # seconds a write may wait for others to join its batch
+    MAX_PENDING = 500  # Firestore's limit on writes per batch
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Held across each commit so writes to a document reach Firestore in the order they were made
+        self.commit_lock = threading.Lock()
+        self.pending = {}  # document path -> (doc_ref, data); a newer write of a job replaces the older
+        self.timer = None
+    
+    def enqueue(self, doc_ref, data):
+        """Queue a document write for the next batch"""
+        with self.lock:
+            self.pending[doc_ref.path] = (doc_ref, data)
+            flush_now = len(self.pending) >= self.MAX_PENDING
+            if not flush_now and self.timer is None:
+                self.timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        if flush_now:
+            self.flush()
+    
+    def flush(self):
+        """Commit every queued write"""
+        with self.commit_lock:
+            with self.lock:
+                pending = list(self.pending.values())
+                self.pending = {}
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+            if not pending:
+                return
+            try:
+                batch = db.batch()
+                for doc_ref, data in pending:
+                    batch.set(doc_ref, data, merge=True)
+                batch.commit()
+            except Exception as e:
+                print(f"Error saving job batch: {e}")
+    
+    def write_now(self, doc_ref, data):
+        """Write a document immediately, dropping its queued write so that older data cannot land after it"""
+        with self.commit_lock:
+            with self.lock:
+                self.pending.pop(doc_ref.path, None)
+            doc_ref.set(data)
+
+_job_write_buffer = _JobWriteBuffer()
+atexit.register(_job_write_buffer.flush)
 
 class ScrapingJob:
     """Model for scraping jobs"""
@@ -11,8 +80,8 @@ class ScrapingJob:
         self.url = url
         self.platform = platform
         self.status = 'queued'
-        self.created_at = datetime.now().isoformat()
-        self.updated_at = datetime.now().isoformat()
+        # Kept as time.time() floats and only formatted when the job is serialized
+        self.created_at = self.updated_at = time.time()
         self.result = None
         self.error = None
     
@@ -24,33 +93,52 @@ class ScrapingJob:
             'url': self.url,
             'platform': self.platform,
             'status': self.status,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
+            'created_at': _isoformat(self.created_at),
+            'updated_at': _isoformat(self.updated_at),
             'result': self.result,
             'error': self.error
         }
     
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a job from its Firestore document without generating a new ID or timestamps"""
+        job = cls.__new__(cls)
+        job.job_id = data['job_id']
+        job.user_id = data['user_id']
+        job.url = data['url']
+        job.platform = data['platform']
+        job.status = data['status']
+        job.created_at = data['created_at']
+        job.updated_at = data['updated_at']
+        job.result = data.get('result')
+        job.error = data.get('error')
+        return job
+    
     def save(self):
         """Save to Firestore"""
         try:
             if not firebase_initialized:
                 return False
-            doc_ref = db.collection('users').document(self.user_id).collection('scraping_jobs').document(self.job_id)
-            doc_ref.set(self.to_dict())
+            _job_write_buffer.write_now(_jobs_collection(self.user_id).document(self.job_id), self.to_dict())
             return True
         except Exception as e:
             print(f"Error saving job: {e}")
             return False
     
-    def update_status(self, status, result=None, error=None):
-        """Update job status"""
+    def update_status(self, status, result=None, error=None, sync=False):
+        """Update job status; the write is batched with other updates unless sync is set"""
         self.status = status
-        self.updated_at = datetime.now().isoformat()
+        self.updated_at = time.time()
         if result:
             self.result = result
         if error:
             self.error = error
-        return self.save()
+        if sync:
+            return self.save()
+        if not firebase_initialized:
+            return False
+        _job_write_buffer.enqueue(_jobs_collection(self.user_id).document(self.job_id), self.to_dict())
+        return True
     
     @classmethod
     def get_by_id(cls, user_id, job_id):
@@ -58,17 +146,9 @@ class ScrapingJob:
         try:
             if not firebase_initialized:
                 return None
-            doc = db.collection('users').document(user_id).collection('scraping_jobs').document(job_id).get()
+            doc = _jobs_collection(user_id).document(job_id).get()
             if doc.exists:
-                data = doc.to_dict()
-                job = cls(data['user_id'], data['url'], data['platform'])
-                job.job_id = data['job_id']
-                job.status = data['status']
-                job.created_at = data['created_at']
-                job.updated_at = data['updated_at']
-                job.result = data.get('result')
-                job.error = data.get('error')
-                return job
+                return cls.from_dict(doc.to_dict())
         except Exception as e:
 # models/job.py (continued from line 43)
             print(f"Error getting job: {e}")
@@ -82,19 +162,11 @@ class ScrapingJob:
                 return []
             
             jobs = []
-            docs = db.collection('users').document(user_id).collection('scraping_jobs').limit(limit).get()
+            docs = _jobs_collection(user_id).limit(limit).get()
             
             for doc in docs:
                 if doc.exists:
-                    data = doc.to_dict()
-                    job = cls(data['user_id'], data['url'], data['platform'])
-                    job.job_id = data['job_id']
-                    job.status = data['status']
-                    job.created_at = data['created_at']
-                    job.updated_at = data['updated_at']
-                    job.result = data.get('result')
-                    job.error = data.get('error')
-                    jobs.append(job)
+                    jobs.append(cls.from_dict(doc.to_dict()))
             
             return jobs
         except Exception as e:
@@ -1,75 +1,104 @@
-import queue
 import threading
-from datetime import datetime, timedelta
+import time
+from collections import defaultdict, deque
 from config import Config
 
+class _CacheShard:
+    """One lock-protected slice of the cache"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}  # key -> (value, monotonic expiry time)
+        self.sets_since_sweep = 0
+
 class QueueManager:
     """In-memory queue manager to replace Redis"""
     
+    # Cache keys are spread over independently locked shards so unrelated keys don't contend,
+    # and each shard drops its expired entries once every CACHE_SWEEP_INTERVAL writes
+    CACHE_SHARDS = 16
+    CACHE_SWEEP_INTERVAL = 1024
+    
     def __init__(self):
-        self.job_queue = queue.Queue(maxsize=Config.MAX_QUEUE_SIZE)
-        self.rate_limit_data = {}
-        self.cache_data = {}
+        # FIFO job buffer; the condition's lock guards it and wakes waiting workers
+        self.job_queue = deque()
+        self.max_queue_size = Config.MAX_QUEUE_SIZE
+        self.job_available = threading.Condition()
+        # "endpoint:client" -> monotonic request times, oldest first
+        self.rate_limit_data = defaultdict(deque)
+        self.cache_shards = [_CacheShard() for _ in range(self.CACHE_SHARDS)]
         self.lock = threading.Lock()
     
     def add_job(self, job_data):
         """Add job to queue"""
-        try:
-            self.job_queue.put(job_data, block=False)
+        with self.job_available:
+            if 0 < self.max_queue_size <= len(self.job_queue):
+                return False
+            self.job_queue.append(job_data)
+            self.job_available.notify()
             return True
-        except queue.Full:
-            return False
     
     def get_job(self, timeout=1):
         """Get job from queue"""
-        try:
-            return self.job_queue.get(timeout=timeout)
-        except queue.Empty:
-            return None
+        with self.job_available:
+            if not self.job_available.wait_for(lambda: self.job_queue, timeout):
+                return None
+            return self.job_queue.popleft()
     
     def check_rate_limit(self, client_id, endpoint, max_requests, window_minutes):
         """Check rate limit for client"""
         with self.lock:
-            current_time = datetime.now()
-            key = f"{endpoint}:{client_id}"
+            current_time = time.monotonic()
+            window_seconds = window_minutes * 60
+            requests = self.rate_limit_data[f"{endpoint}:{client_id}"]
             
-            # Clean old entries
-            if key in self.rate_limit_data:
-                self.rate_limit_data[key] = [
-                    req_time for req_time in self.rate_limit_data[key]
-                    if current_time - req_time < timedelta(minutes=window_minutes)
-                ]
-            else:
-                self.rate_limit_data[key] = []
+            # Clean old entries; times are appended in order, so expired ones are at the left
+            while requests and current_time - requests[0] >= window_seconds:
+                requests.popleft()
             
             # Check limit
-            if len(self.rate_limit_data[key]) >= max_requests:
+            if len(requests) >= max_requests:
                 return False
             
             # Add current request
-            self.rate_limit_data[key].append(current_time)
+            requests.append(current_time)
             return True
     
+    def _cache_shard(self, key):
+        """Shard that holds the given cache key"""
+        return self.cache_shards[hash(key) % self.CACHE_SHARDS]
+    
     def get_cache(self, key):
         """Get cached value"""
-        with self.lock:
-            if key in self.cache_data:
-                data, expiry = self.cache_data[key]
-                if datetime.now() < expiry:
+        shard = self._cache_shard(key)
+        with shard.lock:
+            entry = shard.data.get(key)
+            if entry is not None:
+                data, expiry = entry
+                if time.monotonic() < expiry:
                     return data
                 else:
-                    del self.cache_data[key]
+                    del shard.data[key]
             return None
     
     def set_cache(self, key, value, ttl_seconds=3600):
         """Set cached value with TTL"""
-        with self.lock:
-            expiry = datetime.now() + timedelta(seconds=ttl_seconds)
-            self.cache_data[key] = (value, expiry)
+        shard = self._cache_shard(key)
+        with shard.lock:
+            current_time = time.monotonic()
+            shard.data[key] = (value, current_time + ttl_seconds)
+            
+            # Entries that are never read again would otherwise stay forever
+            shard.sets_since_sweep += 1
+            if shard.sets_since_sweep >= self.CACHE_SWEEP_INTERVAL:
+                shard.sets_since_sweep = 0
+                expired = [k for k, (_, expiry) in shard.data.items() if expiry <= current_time]
+                for k in expired:
+                    del shard.data[k]
     
     def get_queue_size(self):
         """Get current queue size"""
-        return self.job_queue.qsize()
+        return len(self.job_queue)
 
 # Global queue manager instance
 queue_manager = QueueManager()
@@ -551,6 +551,11 @@ current_distance_side = 200
                 'current_distance_side': 200
             }
             
+            # A stage whose predecessor failed imports it instead; drop any copy a previous job left
+            # in sys.modules so that import runs on this job's photos, not the last user's
+            for module_name in ('decrease_contrast', 'remove_backround'):
+                sys.modules.pop(module_name, None)
+            
             successful_modules = 0
             for module_file, description in modules_to_run:
                 print(f"\n[PROCESSING] {description}...")